@@ -0,0 +1,143 @@
+"""
+Atlas des miniatures du catalogue.
+
+Étape de construction (à relancer quand les images ou les CSV changent) :
+    python atlas_images.py
+
+Toutes les images du catalogue (colonne image_path des CSV de dossiercsv/ et
+l'image par défaut) sont redimensionnées aux tailles utilisées par la boutique
+et rangées en grille dans quelques grandes images (une feuille par taille,
+plus si elle dépasse TAILLE_FEUILLE), enregistrées dans images/atlas/ avec un
+index JSON : (chemin, taille) -> feuille et rectangle.
+
+Au lancement, CacheImages (classes_frontend) charge une feuille au lieu de
+chaque image, et chaque miniature est une sous-surface de la feuille : les
+widgets dessinent directement la zone correspondante de l'atlas partagé,
+sans copie des pixels. Une image source modifiée depuis la construction
+(taille ou date différente) est ignorée dans l'atlas et chargée normalement.
+"""
+
+import json
+import os
+import sys
+
+import pygame
+
+from classes_frontend import IMAGE_PAR_DEFAUT
+
+
+DOSSIER_ATLAS = os.path.join(".", "images", "atlas")
+INDEX_ATLAS = os.path.join(DOSSIER_ATLAS, "atlas.json")
+TAILLE_FEUILLE = 2048
+VERSION = 1
+
+
+def tailles_boutique():
+    """Tailles des miniatures affichées : grille de la boutique et lignes du panier."""
+    from classes_boutiques import Inventaire_Produits
+    from classes_frontend import ProduitPanier
+
+    largeur, hauteur = ProduitPanier.__init__.__defaults__[:2]
+    return [(Inventaire_Produits.LARGEUR - 40, Inventaire_Produits.HAUTEUR - 140),
+            (largeur - 20, hauteur - 120)]
+
+
+def images_catalogue(dossier_csv=None):
+    """Chemins d'images distincts du catalogue, existants, plus l'image par défaut."""
+    from boutique import CATEGORIES, DOSSIER_CSV, lire_colonnes_categorie
+
+    dossier_csv = dossier_csv or DOSSIER_CSV
+    chemins = {os.path.normpath(IMAGE_PAR_DEFAUT)}
+    for categorie, (fichier, _, _, _) in CATEGORIES.items():
+        valeurs = lire_colonnes_categorie(categorie, os.path.join(dossier_csv, fichier))
+        chemins.update(os.path.normpath(c) for c in valeurs["image_path"] if c and os.path.exists(c))
+    return sorted(chemins)
+
+
+def _source(chemin):
+    stat = os.stat(chemin)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def construire_atlas(chemins, tailles, dossier=DOSSIER_ATLAS):
+    """
+    Construit les feuilles et l'index. Retourne le nombre de feuilles écrites.
+    Les miniatures d'une même taille sont rangées en grille, ligne par ligne.
+    """
+    os.makedirs(dossier, exist_ok=True)
+    index = {"version": VERSION, "sources": {}, "miniatures": []}
+    feuilles = 0
+    for largeur, hauteur in tailles:
+        colonnes = max(1, TAILLE_FEUILLE // largeur)
+        par_feuille = colonnes * max(1, TAILLE_FEUILLE // hauteur)
+        for debut in range(0, len(chemins), par_feuille):
+            lot = chemins[debut:debut + par_feuille]
+            lignes = -(-len(lot) // colonnes)
+            feuille = pygame.Surface((min(len(lot), colonnes) * largeur, lignes * hauteur),
+                                     pygame.SRCALPHA)
+            nom = f"atlas_{largeur}x{hauteur}_{debut // par_feuille}.png"
+            for i, chemin in enumerate(lot):
+                x, y = (i % colonnes) * largeur, (i // colonnes) * hauteur
+                feuille.blit(pygame.transform.scale(pygame.image.load(chemin), (largeur, hauteur)), (x, y))
+                index["miniatures"].append([chemin, largeur, hauteur, nom, x, y])
+                index["sources"][chemin] = _source(chemin)
+            pygame.image.save(feuille, os.path.join(dossier, nom))
+            feuilles += 1
+    with open(os.path.join(dossier, "atlas.json"), "w", encoding="utf-8") as fichier:
+        json.dump(index, fichier)
+    return feuilles
+
+
+class Atlas:
+    """
+    Index chargé depuis le disque. Les feuilles ne sont lues (et converties
+    au format de l'écran) qu'à la première miniature demandée dans chacune.
+    """
+
+    def __init__(self, fichier_index=INDEX_ATLAS):
+        self.dossier = os.path.dirname(fichier_index)
+        self._miniatures = {}
+        self._feuilles = {}
+        with open(fichier_index, encoding="utf-8") as fichier:
+            index = json.load(fichier)
+        if index.get("version") != VERSION:
+            return
+        a_jour = {chemin for chemin, source in index["sources"].items()
+                  if os.path.exists(chemin) and _source(chemin) == source}
+        for chemin, largeur, hauteur, nom, x, y in index["miniatures"]:
+            if chemin in a_jour:
+                self._miniatures[(chemin, (largeur, hauteur))] = (nom, pygame.Rect(x, y, largeur, hauteur))
+
+    def __len__(self):
+        return len(self._miniatures)
+
+    def miniature(self, chemin, taille):
+        """Sous-surface de l'atlas pour (chemin, taille), ou None si elle n'y est pas."""
+        entree = self._miniatures.get((os.path.normpath(chemin), tuple(taille)))
+        if entree is None:
+            return None
+        nom, rect = entree
+        feuille = self._feuilles.get(nom)
+        if feuille is None:
+            feuille = pygame.image.load(os.path.join(self.dossier, nom))
+            if pygame.display.get_surface() is not None:
+                feuille = feuille.convert_alpha()
+            self._feuilles[nom] = feuille
+        return feuille.subsurface(rect)
+
+
+def charger_atlas(fichier_index=INDEX_ATLAS):
+    """Atlas construit par ce module, ou None s'il n'existe pas (ou est illisible)."""
+    try:
+        return Atlas(fichier_index)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+if __name__ == "__main__":
+    dossier_csv = sys.argv[1] if len(sys.argv) > 1 else None
+    chemins = images_catalogue(dossier_csv)
+    tailles = tailles_boutique()
+    nombre = construire_atlas(chemins, tailles)
+    print(f"{len(chemins)} images x {len(tailles)} tailles rangées dans {nombre} feuille(s) "
+          f"({DOSSIER_ATLAS})")
@@ -0,0 +1,169 @@
+"""
+BENCHMARK DU TEMPS D'AFFICHAGE D'UNE IMAGE DE LA BOUTIQUE
+=========================================================
+
+Construit l'écran de la boutique (fenêtre et boutons de catégories, grille
+de produits, panier de `--panier` lignes, popups) sur une surface hors écran
+et mesure :
+- le temps de construction de l'écran, avec les polices partagées
+  (classes_frontend.police) ou une police SysFont par texte et par bouton
+- le temps médian pour dessiner l'écran entièrement, avec le cache de rendu
+  des textes (classes_frontend.rendre_texte) ou comme avant : chaque texte
+  rendu à chaque image, et une police SysFont créée à chaque image pour le
+  total du panier
+- avec classes_frontend.MoteurRendu (rectangles sales) : le temps d'une
+  image sans changement, et d'une image où une ligne du panier change de
+  quantité, comparés au dessin complet suivi de pygame.display.flip()
+
+Usage :
+    python benchmarks/bench_affichage.py
+    python benchmarks/bench_affichage.py --panier 50 --images 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import classes_frontend
+from classes_boutiques import Factory, Inventaire_Produits, Inventaire_boisson
+from classes_frontend import Bouton, Fenetre, MoteurRendu, Panier_fenetre, PopUp
+
+
+def construire_ecran(lignes_panier, popups):
+    fenetre = Fenetre(0, 0, 750, 600, (200, 200, 200))
+    fenetre.ajouter_texte("Vous êtes dans la Boutique", 250, 10, couleur=(0, 100, 0), taille=35)
+    for i, nom in enumerate(["Boisson", "Inscription", "Configuration PC", "Mercenariat", "prix", "alpa"]):
+        Bouton(fenetre, 20 + 110 * i, 50, 100, 30, (100, 150, 255), (nom, 20))
+
+    factory = Factory()
+    inventaire = Inventaire_boisson()
+    inventaire.ajouter_produits(factory.create_Boisson(f"B{i}", f"Boisson {i}", "0.5", f"{1 + i % 9}.50",
+                                                       "./images/eau_50cl.jpg")
+                                for i in range(max(8, lignes_panier)))
+    panier = Panier_fenetre(750, 0, 250, 600)
+    grille = Inventaire_Produits(panier)
+    grille.importer_liste(inventaire)
+    for produit in inventaire.liste[:lignes_panier]:
+        panier.ajouter_produit(produit)
+    fenetres_popups = []
+    for i in range(popups):
+        fenetres_popups.append(PopUp(f"Popup {i}", (1000, 600), fenetres_popups))
+    return [fenetre, *grille.liste, panier, *fenetres_popups]
+
+
+def mesurer_construction(lignes_panier, popups, repetitions=5):
+    durees = []
+    for _ in range(repetitions):
+        classes_frontend._polices.clear()
+        classes_frontend._rendus.clear()
+        debut = time.perf_counter()
+        construire_ecran(lignes_panier, popups)
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees)
+
+
+def dessiner(ecran, widgets):
+    ecran.fill((255, 255, 255))
+    for widget in widgets:
+        widget.afficher(ecran)
+
+
+def mesurer(ecran, widgets, images, avant_chaque_image=None):
+    dessiner(ecran, widgets)   # images chargées, textes rendus une première fois
+    durees = []
+    for _ in range(images):
+        debut = time.perf_counter()
+        if avant_chaque_image is not None:
+            avant_chaque_image()
+        dessiner(ecran, widgets)
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees)
+
+
+def mesurer_moteur(ecran, widgets, images, avant_chaque_image=None):
+    moteur = MoteurRendu(ecran)
+    moteur.dessiner(widgets)
+    durees = []
+    for _ in range(images):
+        debut = time.perf_counter()
+        if avant_chaque_image is not None:
+            avant_chaque_image()
+        moteur.dessiner(widgets)
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees)
+
+
+def textes(widgets):
+    for widget in widgets:
+        yield from widget.textes
+        for ligne in getattr(widget, "produits", []):
+            yield from ligne.textes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de dessin d'une image de la boutique")
+    parser.add_argument("--panier", type=int, default=20, help="lignes dans le panier")
+    parser.add_argument("--popups", type=int, default=3)
+    parser.add_argument("--images", type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    ecran = pygame.display.set_mode((1000, 600))
+
+    construction = mesurer_construction(args.panier, args.popups)
+    police = classes_frontend.police
+    classes_frontend.police = lambda taille, nom=None: pygame.font.SysFont(nom, taille)
+    construction_sans_registre = mesurer_construction(args.panier, args.popups)
+    classes_frontend.police = police
+
+    widgets = construire_ecran(args.panier, args.popups)
+    for _ in range(50):             # laisse les images se charger en arrière-plan
+        dessiner(ecran, widgets)
+        time.sleep(0.01)
+
+    avec_cache = mesurer(ecran, widgets, args.images)
+
+    # Ancien comportement : aucun rendu conservé d'une image à l'autre
+    entrees = list(textes(widgets))
+    def tout_rendre_a_nouveau():
+        for entree in entrees:
+            entree["rendu"] = None
+        classes_frontend._rendus.clear()
+        pygame.font.SysFont(None, 30)   # ancienne police du total du panier
+    sans_cache = mesurer(ecran, widgets, args.images, tout_rendre_a_nouveau)
+
+    # flip de l'image précédente puis dessin complet : même coût par image
+    complet = mesurer(ecran, widgets, args.images, pygame.display.flip)
+    panier = next(w for w in widgets if isinstance(w, Panier_fenetre))
+    produit = panier.produits[0].parent if panier.produits else widgets[1].parent
+    etat = {"ajout": True}
+    def changer_quantite():
+        if etat["ajout"]:
+            panier.ajouter_produit(produit)
+        else:
+            panier.supprimer_produit(produit.id)
+        etat["ajout"] = not etat["ajout"]
+    moteur_inchange = mesurer_moteur(ecran, widgets, args.images)
+    moteur_quantite = mesurer_moteur(ecran, widgets, args.images, changer_quantite)
+
+    print(f"\nÉcran boutique : {len(widgets)} fenêtres, {len(entrees)} textes, "
+          f"{args.panier} lignes de panier")
+    print(f"  • Construction, une police par widget : {construction_sans_registre * 1000:7.1f} ms")
+    print(f"  • Construction, polices partagées      : {construction * 1000:7.1f} ms")
+    print(f"  • Image, sans cache de rendu           : {sans_cache * 1000:7.2f} ms")
+    print(f"  • Image, avec cache de rendu           : {avec_cache * 1000:7.2f} ms")
+    print(f"  • Image complète + flip                : {complet * 1000:7.2f} ms")
+    print(f"  • MoteurRendu, rien n'a changé         : {moteur_inchange * 1000:7.2f} ms")
+    print(f"  • MoteurRendu, quantité modifiée       : {moteur_quantite * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+BENCHMARK DE L'ENCAISSEMENT
+===========================
+
+Simule une vente de tickets : `--commandes` commandes réparties sur
+`--clients` clients, chaque commande ayant un MessageObserver. La sortie
+est redirigée vers un fichier temporaire vidé à chaque ligne, comme un
+terminal (stdout interactif est "line buffered"), sans le coût d'affichage.
+
+Compare :
+- l'encaissement commande par commande (strategie.payer sur chaque paire)
+- PaymentStrategy.payer_lot (soldes débités en bloc, notifications par lots)
+
+Usage :
+    python benchmarks/bench_caisse.py
+    python benchmarks/bench_caisse.py --commandes 200000 --clients 5000 --taille-lot 1000
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from classes_boutiques import (Client, CreditCardStrategy, MessageObserver,
+                               Order, TicketHackathon)
+
+
+def preparer(nombre_commandes, nombre_clients):
+    """Clients et commandes d'une vente de tickets ; environ 10 % des commandes sont refusées"""
+    tickets = [TicketHackathon(f"TK{i}", f"Ticket {i}", 15.0 + i, None) for i in range(3)]
+    commandes_par_client = nombre_commandes / nombre_clients
+    clients = [Client(i, f"Nom{i}", f"Prenom{i}", None,
+                      round(16.0 * commandes_par_client * 0.9, 2), None)
+               for i in range(nombre_clients)]
+    observer = MessageObserver()
+    paiements = []
+    for i in range(nombre_commandes):
+        order = Order("En attente", clients[i % nombre_clients].nom, [tickets[i % 3]])
+        order.add_observer(observer)
+        paiements.append((clients[i % nombre_clients], order))
+    return paiements
+
+
+def un_par_un(strategie, paiements, taille_lot):
+    for client, order in paiements:
+        strategie.payer(client, order)
+
+
+def par_lot(strategie, paiements, taille_lot):
+    strategie.payer_lot(paiements, taille_lot)
+
+
+def chronometrer(nom, fonction, args):
+    paiements = preparer(args.commandes, args.clients)
+    with tempfile.TemporaryFile("w", buffering=1) as sortie, contextlib.redirect_stdout(sortie):
+        debut = time.perf_counter()
+        fonction(CreditCardStrategy(), paiements, args.taille_lot)
+        duree = time.perf_counter() - debut
+    payees = sum(order.statut == CreditCardStrategy.statut_paye for _, order in paiements)
+    print(f"  • {nom:12} : {duree:7.3f} s  {args.commandes / duree:10.0f} commandes/s  "
+          f"({payees} payées)")
+    return duree, [order.statut for _, order in paiements]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encaissement : commande par commande vs par lot")
+    parser.add_argument("--commandes", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--taille-lot", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"\n{args.commandes} commandes, {args.clients} clients :")
+    duree_unitaire, statuts_unitaire = chronometrer("un par un", un_par_un, args)
+    duree_lot, statuts_lot = chronometrer("par lot", par_lot, args)
+    assert statuts_unitaire == statuts_lot, "les deux modes doivent donner les mêmes statuts"
+    print(f"  • Gain         : {duree_unitaire / duree_lot:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
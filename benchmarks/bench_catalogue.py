@@ -0,0 +1,78 @@
+"""
+BENCHMARK DU CHARGEMENT DU CATALOGUE
+====================================
+
+Génère un CSV synthétique de boissons (même format que dossiercsv/boisson.csv)
+et compare :
+- l'ancien chargement, une boucle df.iterrows() appelant la Factory
+- boutique.charger_categorie, qui lit les colonnes typées et les convertit en bloc
+
+Usage :
+    python benchmarks/bench_catalogue.py
+    python benchmarks/bench_catalogue.py --nombre 1000000 --sans-iterrows
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+
+from classes_boutiques import Factory, Inventaire_boisson
+
+
+def ecrire_csv(chemin, nombre):
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        fichier.write("id;nom;volume;prix;image_path\n")
+        for i in range(nombre):
+            fichier.write(f"B{i};Boisson {i};{0.25 + (i % 8) * 0.25};{1 + (i % 400) / 100:.2f};"
+                          f"./images/boisson_{i % 50}.jpg\n")
+
+
+def charger_iterrows(chemin):
+    """Reproduction de l'ancien create_boisson_from_csv"""
+    inventaire = Inventaire_boisson()
+    factory = Factory()
+    for index, row in pd.read_csv(chemin, sep=";").iterrows():
+        inventaire.ajouter_produit(factory.create_Boisson(
+            row['id'], row['nom'], row['volume'], row['prix'], row['image_path']))
+    return inventaire
+
+
+def charger_colonnes(chemin):
+    from boutique import charger_categorie, lire_csv_categorie
+    return charger_categorie(Inventaire_boisson(), "boisson",
+                             lire_csv_categorie("boisson", chemin))
+
+
+def chronometrer(nom, fonction, chemin):
+    debut = time.perf_counter()
+    inventaire = fonction(chemin)
+    duree = time.perf_counter() - debut
+    print(f"  • {nom:12} : {duree:8.2f} s  ({len(inventaire)} produits)")
+    return duree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chargement du catalogue : iterrows vs colonnes")
+    parser.add_argument("--nombre", type=int, default=100000)
+    parser.add_argument("--sans-iterrows", action="store_true",
+                        help="ne mesure pas l'ancien chargement (trop lent à 1M lignes)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "boisson.csv")
+        ecrire_csv(chemin, args.nombre)
+        print(f"\nCatalogue de {args.nombre} lignes :")
+        duree_colonnes = chronometrer("colonnes", charger_colonnes, chemin)
+        if not args.sans_iterrows:
+            duree_iterrows = chronometrer("iterrows", charger_iterrows, chemin)
+            print(f"  • Gain         : {duree_iterrows / duree_colonnes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
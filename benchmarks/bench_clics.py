@@ -0,0 +1,101 @@
+"""
+BENCHMARK DE LA RECHERCHE DU BOUTON CLIQUÉ
+==========================================
+
+Construit une scène de `--widgets` cartes produit (Produit_Fenetre, un
+bouton "Acheter" chacune) rangées en grille, plus la fenêtre de fond, puis
+compare pour `--clics` clics tirés au hasard :
+- l'ancienne boucle : est_clique sur chaque bouton de chaque widget
+- classes_frontend.IndexClics (grille uniforme de cellules)
+
+Mesure aussi la mise à jour de l'index quand un seul widget a bougé.
+
+Usage :
+    python benchmarks/bench_clics.py
+    python benchmarks/bench_clics.py --widgets 10 100 1000 10000 --clics 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+from classes_boutiques import Factory
+from classes_frontend import Bouton, Fenetre, IndexClics, Produit_Fenetre
+
+
+def construire_scene(nombre):
+    factory = Factory()
+    colonnes = max(1, int(nombre ** 0.5))
+    lignes = -(-nombre // colonnes)
+    fond = Fenetre(0, 0, 160 * colonnes, 260 * lignes, (200, 200, 200))
+    Bouton(fond, 10, 10, 100, 30, (255, 100, 100), ("Menu", 30))
+    scene = [fond]
+    for i in range(nombre):
+        produit = factory.create_TicketHackathon(f"T{i}", f"Ticket {i}", "10", "")
+        x, y = 160 * (i % colonnes), 50 + 260 * (i // colonnes)
+        scene.append(Produit_Fenetre(produit, x, y, 150, 225, (255, 255, 255), None))
+    return scene
+
+
+def lineaire(scene, pos):
+    for widget in scene:
+        for bouton in widget.boutons:
+            if bouton.est_clique(pos):
+                return bouton
+    return None
+
+
+def mesurer(fonction, positions):
+    debut = time.perf_counter()
+    for pos in positions:
+        fonction(pos)
+    return (time.perf_counter() - debut) / len(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clics : boucle sur tous les boutons vs IndexClics")
+    parser.add_argument("--widgets", type=int, nargs="+", default=[8, 100, 1000, 10000])
+    parser.add_argument("--clics", type=int, default=10000)
+    args = parser.parse_args()
+
+    pygame.init()
+    aleatoire = random.Random(42)
+    print()
+    for nombre in args.widgets:
+        scene = construire_scene(nombre)
+        for widget in scene:
+            for bouton in widget.boutons:
+                bouton.action = None     # mesurer la recherche seule
+        fond = scene[0]
+        positions = [(aleatoire.randrange(fond.largeur), aleatoire.randrange(fond.hauteur))
+                     for _ in range(args.clics)]
+
+        index = IndexClics()
+        debut = time.perf_counter()
+        index.synchroniser(scene)
+        construction = time.perf_counter() - debut
+        for pos in positions[:1000]:
+            assert index.bouton(pos) is lineaire(scene, pos), pos
+
+        scene[-1].x += 5
+        debut = time.perf_counter()
+        index.synchroniser(scene)
+        mise_a_jour = time.perf_counter() - debut
+
+        duree_lineaire = mesurer(lambda pos: lineaire(scene, pos), positions)
+        duree_index = mesurer(index.bouton, positions)
+        print(f"  • {nombre:6} widgets : boucle {duree_lineaire * 1e6:9.1f} µs/clic  "
+              f"index {duree_index * 1e6:6.2f} µs/clic  "
+              f"(construction {construction * 1000:7.1f} ms, un widget déplacé {mise_a_jour * 1000:6.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+BENCHMARK DU DÉMARRAGE DE L'APPLICATION
+=======================================
+
+Mesure, dans des interpréteurs neufs :
+- le temps jusqu'à la première image de main.py (pilote SDL "dummy" si aucun
+  affichage n'est imposé), et les modules lourds déjà importés à ce moment
+- le temps d'import des modules de l'application et des dépendances lourdes
+
+Usage :
+    python benchmarks/bench_demarrage.py
+    python benchmarks/bench_demarrage.py --repetitions 10 --importtime
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MODULES_LOURDS = ["pandas", "folium", "jinja2", "requests", "numpy"]
+IMPORTS = ["pygame", "classes_frontend", "boutique", "map_finale", "pandas", "folium"]
+
+# Exécuté dans le processus enfant : lance main.py et s'arrête à la première image
+_PREMIERE_IMAGE = """
+import json, os, runpy, sys, time
+debut = time.perf_counter()
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+def premiere_image(*args, **kwargs):
+    print(json.dumps({
+        "premiere_image_s": time.perf_counter() - debut,
+        "modules_lourds": [m for m in %r if m in sys.modules],
+    }))
+    sys.stdout.flush()
+    os._exit(0)
+
+pygame.display.flip = premiere_image
+pygame.display.update = premiere_image
+sys.argv = ["main.py"]
+runpy.run_path("main.py", run_name="__main__")
+""" % (MODULES_LOURDS,)
+
+
+def _enfant(code, *options):
+    """Exécute `code` dans un nouvel interpréteur ; retourne (durée totale, sortie, erreurs)"""
+    debut = time.perf_counter()
+    resultat = subprocess.run([sys.executable, *options, "-c", code], cwd=RACINE,
+                              capture_output=True, text=True,
+                              env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"))
+    return time.perf_counter() - debut, resultat.stdout, resultat.stderr
+
+
+def mesurer_premiere_image(repetitions):
+    durees_totales, durees_internes, modules = [], [], []
+    for _ in range(repetitions):
+        duree, sortie, erreurs = _enfant(_PREMIERE_IMAGE)
+        ligne = sortie.strip().splitlines()[-1] if sortie.strip() else ""
+        if not ligne.startswith("{"):
+            raise RuntimeError(f"main.py n'a pas affiché d'image :\n{erreurs}")
+        mesure = json.loads(ligne)
+        durees_totales.append(duree)
+        durees_internes.append(mesure["premiere_image_s"])
+        modules = mesure["modules_lourds"]
+    return statistics.median(durees_totales), statistics.median(durees_internes), modules
+
+
+def mesurer_import(module, repetitions):
+    durees = [_enfant(f"import {module}")[0] for _ in range(repetitions)]
+    base = statistics.median(_enfant("pass")[0] for _ in range(repetitions))
+    return statistics.median(durees) - base
+
+
+def afficher_importtime(module, nombre=10):
+    """Les `nombre` imports les plus coûteux (cumulés) selon python -X importtime"""
+    _, _, erreurs = _enfant(f"import {module}", "-X", "importtime")
+    lignes = []
+    for ligne in erreurs.splitlines():
+        if ligne.startswith("import time:") and "|" in ligne:
+            _, cumule, nom = ligne[len("import time:"):].split("|")
+            if cumule.strip().isdigit():
+                lignes.append((int(cumule), nom.rstrip()))
+    print(f"\nImports les plus coûteux pour 'import {module}' (cumulé) :")
+    for cumule, nom in sorted(lignes, reverse=True)[:nombre]:
+        print(f"  {cumule / 1000:8.1f} ms  {nom}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage de l'application")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true",
+                        help="détaille les imports de main.py avec python -X importtime")
+    args = parser.parse_args()
+
+    totale, interne, modules = mesurer_premiere_image(args.repetitions)
+    print(f"\nPremière image de main.py (médiane sur {args.repetitions}) :")
+    print(f"  • depuis le lancement du processus : {totale * 1000:7.0f} ms")
+    print(f"  • depuis le début du script        : {interne * 1000:7.0f} ms")
+    print(f"  • modules lourds chargés           : {', '.join(modules) or 'aucun'}")
+
+    print("\nTemps d'import (médiane, hors démarrage de l'interpréteur) :")
+    for module in IMPORTS:
+        print(f"  • {module:18} : {mesurer_import(module, args.repetitions) * 1000:7.0f} ms")
+
+    if args.importtime:
+        afficher_importtime("boutique")
+
+
+if __name__ == "__main__":
+    main()
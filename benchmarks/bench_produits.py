@@ -0,0 +1,145 @@
+"""
+BENCHMARK MÉMOIRE DU MODÈLE PRODUIT
+===================================
+
+Compare la mémoire par produit des classes de classes_boutiques (avec
+__slots__ et chaînes répétées internées par la Factory) aux classes
+d'origine, recopiées ici sans __slots__ (un __dict__ par instance) :
+- __dict__ tel quel : depuis Python 3.11, les attributs restent rangés dans
+  l'objet tant que personne ne lit __dict__
+- __dict__ matérialisé : chaque __dict__ est lu une fois, ce qui le crée
+  comme dans les versions précédentes de Python (ou dès que du code
+  l'inspecte : vars(), copy, pickle...)
+
+Usage :
+    python benchmarks/bench_produits.py
+    python benchmarks/bench_produits.py --nombre 500000
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from classes_boutiques import Factory
+
+
+TAILLES = ["S", "M", "L", "XL"]
+NIVEAUX = ["Junior", "Intermédiaire", "Senior"]
+
+
+def _arguments(i):
+    """Arguments Factory de la i-ème ligne d'un catalogue synthétique"""
+    image = f"images/produit_{i % 50}.png"
+    return [
+        ("create_Boisson", (f"B{i}", f"Boisson {i}", "0.5", "1.20", image)),
+        ("create_Food", (f"F{i}", f"Food {i}", "4.50", image)),
+        ("create_Vetement", (f"V{i}", f"Vetement {i}", "15.00", TAILLES[i % 4], image)),
+        ("create_Tech", (f"T{i}", f"Tech {i}", "129.90", "2", image)),
+        ("create_Developpeur", (f"D{i}", f"Dev {i}", "450.00", NIVEAUX[i % 3], image)),
+        ("create_TicketHackathon", (f"TK{i}", f"Ticket {i}", "15.00", image)),
+    ]
+
+
+# ---- Classes d'origine (sans __slots__), hiérarchie séparée ----
+class ProduitDict:
+    def __init__(self, id, nom, prix, image_path=None):
+        self.id = id
+        self.nom = nom
+        self.prix = prix
+        self.image_path = image_path
+
+
+class BoissonDict(ProduitDict):
+    def __init__(self, id, nom, prix, volume, image_path=None):
+        super().__init__(id, nom, prix, image_path)
+        self.volume = volume
+
+
+class FoodDict(ProduitDict):
+    pass
+
+
+class VetementDict(ProduitDict):
+    def __init__(self, id, nom, prix, taille, image_path=None):
+        super().__init__(id, nom, prix, image_path)
+        self.taille = taille
+
+
+class TechDict(ProduitDict):
+    def __init__(self, id, nom, prix, garantie, image_path=None):
+        super().__init__(id, nom, prix, image_path)
+        self.garantie = garantie
+
+
+class DeveloppeurDict(ProduitDict):
+    def __init__(self, id, nom, prix, niveau, image_path=None):
+        super().__init__(id, nom, prix, image_path)
+        self.niveau = niveau
+
+
+class TicketDict(ProduitDict):
+    pass
+
+
+class FactoryAvecDict:
+    """Reproduit l'ancienne Factory : mêmes conversions, instances à __dict__, pas d'internement"""
+
+    def create_Boisson(self, id, nom, volume, prix, image_path):
+        return BoissonDict(id, nom, float(prix), float(volume), image_path)
+    def create_Food(self, id, nom, prix, image_path):
+        return FoodDict(id, nom, float(prix), image_path)
+    def create_Vetement(self, id, nom, prix, taille, image_path):
+        return VetementDict(id, nom, float(prix), taille, image_path)
+    def create_Tech(self, id, nom, prix, garantie, image_path):
+        return TechDict(id, nom, float(prix), int(garantie), image_path)
+    def create_Developpeur(self, id, nom, prix, niveau, image_path):
+        return DeveloppeurDict(id, nom, float(prix), niveau, image_path)
+    def create_TicketHackathon(self, id, nom, prix, image_path):
+        return TicketDict(id, nom, float(prix), image_path)
+
+
+def mesurer(factory, nombre, materialiser=False):
+    """Retourne (octets par produit, produits) pour `nombre` lignes de catalogue"""
+    lignes = [_arguments(i) for i in range(nombre)]
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0]
+    produits = [getattr(factory, methode)(*args) for ligne in lignes for methode, args in ligne]
+    if materialiser:
+        for p in produits:
+            p.__dict__
+    apres = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # On retire la liste elle-même (pointeurs), présente dans les deux cas
+    octets = apres - avant - sys.getsizeof(produits)
+    return octets / len(produits), produits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire par produit : __slots__ vs __dict__")
+    parser.add_argument("--nombre", type=int, default=100000,
+                        help="nombre de lignes par catégorie (6 produits par ligne)")
+    args = parser.parse_args()
+
+    par_produit_dict, produits_dict = mesurer(FactoryAvecDict(), args.nombre)
+    assert produits_dict[0].__dict__    # attributs bien dans un __dict__ par instance
+    del produits_dict
+    par_produit_materialise, produits_dict = mesurer(FactoryAvecDict(), args.nombre, materialiser=True)
+    del produits_dict
+    par_produit_slots, produits_slots = mesurer(Factory(), args.nombre)
+    assert not hasattr(produits_slots[0], "__dict__")
+
+    print(f"\nProduits créés : {len(produits_slots)} (Python {sys.version.split()[0]})")
+    print(f"  • __dict__ tel quel     : {par_produit_dict:7.1f} octets / produit  "
+          f"({par_produit_dict / par_produit_slots:.2f}x)")
+    print(f"  • __dict__ matérialisé  : {par_produit_materialise:7.1f} octets / produit  "
+          f"({par_produit_materialise / par_produit_slots:.2f}x)")
+    print(f"  • __slots__             : {par_produit_slots:7.1f} octets / produit")
+    print("\nLes chaînes d'entrée sont créées avant la mesure ; les float prix / volume")
+    print("sont comptés dans tous les cas.")
+
+
+if __name__ == "__main__":
+    main()
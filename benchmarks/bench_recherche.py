@@ -0,0 +1,142 @@
+"""
+BENCHMARK DE LA RECHERCHE DANS LE CATALOGUE
+===========================================
+
+Construit un catalogue synthétique réparti sur les six catégories, indexe
+le tout avec recherche.IndexRecherche, puis compare pour quelques requêtes
+typiques (texte, prix, facettes, combinaisons) :
+- l'index
+- un parcours linéaire de tous les produits avec les mêmes critères
+
+Usage :
+    python benchmarks/bench_recherche.py
+    python benchmarks/bench_recherche.py --nombre 1000000 --repetitions 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from boutique import CATEGORIES
+from classes_boutiques import Factory
+from recherche import IndexRecherche, mots
+
+
+TAILLES = ["S", "M", "L", "XL"]
+NIVEAUX = ["Junior", "Intermédiaire", "Senior", "Expert"]
+MARQUES = ["Hackathon", "Python", "Pixel", "Nova", "Atlas", "Zenith", "Orbit", "Delta"]
+TYPES = {
+    "boisson": ["Soda", "Jus", "Eau", "Thé glacé", "Café froid"],
+    "food": ["Pizza", "Burger", "Cookie", "Salade", "Wrap"],
+    "vetement": ["T-shirt", "Sweat", "Casquette", "Chaussettes"],
+    "tech": ["Clavier", "Souris", "Casque", "Écran", "Câble USB"],
+    "developpeur": ["Développeur backend", "Développeuse frontend", "Data scientist"],
+    "ticket": ["Ticket", "Pass VIP", "Entrée atelier"],
+}
+
+
+def generer(nombre):
+    """Inventaires par catégorie, `nombre` produits au total"""
+    factory = Factory()
+    inventaires = {}
+    par_categorie = nombre // len(CATEGORIES)
+    for c, (categorie, (_, classe, methode, _)) in enumerate(CATEGORIES.items()):
+        inventaire = classe()
+        creer = getattr(factory, methode)
+        types = TYPES[categorie]
+        produits = []
+        for i in range(par_categorie):
+            id_produit = f"{categorie[:2].upper()}{i}"
+            nom = f"{types[i % len(types)]} {MARQUES[(i // 7) % len(MARQUES)]} {i}"
+            prix = str(1 + (i * 37 + c) % 50000 / 100)
+            image = f"images/{categorie}_{i % 20}.png"
+            if categorie == "boisson":
+                produits.append(creer(id_produit, nom, str(0.25 * (1 + i % 6)), prix, image))
+            elif categorie == "vetement":
+                produits.append(creer(id_produit, nom, prix, TAILLES[i % 4], image))
+            elif categorie == "tech":
+                produits.append(creer(id_produit, nom, prix, str(1 + i % 3), image))
+            elif categorie == "developpeur":
+                produits.append(creer(id_produit, nom, prix, NIVEAUX[i % 4], image))
+            else:
+                produits.append(creer(id_produit, nom, prix, image))
+        inventaire.ajouter_produits(produits)
+        inventaires[categorie] = inventaire
+    return inventaires
+
+
+REQUETES = [
+    ("texte 'python'", dict(texte="python", limite=12)),
+    ("préfixe 'clav'", dict(texte="clav", limite=12)),
+    ("prix 10-10.5 € par prix", dict(prix_min=10, prix_max=10.5, tri="prix", limite=12)),
+    ("vetement taille M/L < 20 €", dict(categorie="vetement", taille=["M", "L"], prix_max=20, limite=12)),
+    ("dev Senior 'data' par prix", dict(texte="data", niveau="Senior", tri="prix", limite=12)),
+    ("tech garantie 3, 'atlas'", dict(texte="atlas", garantie=3, limite=12)),
+    ("boisson 1.5 L, 'soda'", dict(texte="soda", volume=1.5, limite=12)),
+]
+
+
+def lineaire(inventaires, texte="", prix_min=None, prix_max=None, tri=None, limite=None, **facettes):
+    """Même requête, en parcourant tous les produits"""
+    termes = mots(texte)
+    resultat = []
+    for categorie, inventaire in inventaires.items():
+        if "categorie" in facettes and categorie != facettes["categorie"]:
+            continue
+        for p in inventaire._produits.values():
+            if prix_min is not None and p.prix < prix_min or prix_max is not None and p.prix > prix_max:
+                continue
+            if any(f != "categorie" and getattr(p, f, None) not in (v if isinstance(v, list) else [v])
+                   for f, v in facettes.items()):
+                continue
+            if termes:
+                mots_nom = mots(p.nom)
+                if not all(t in mots_nom for t in termes[:-1]) or \
+                        not any(m.startswith(termes[-1]) for m in mots_nom):
+                    continue
+            resultat.append(p)
+    if tri == "prix":
+        resultat.sort(key=lambda p: p.prix)
+    return len(resultat), resultat[:limite]
+
+
+def mediane(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees), resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche : index vs parcours linéaire")
+    parser.add_argument("--nombre", type=int, default=1000000)
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--sans-lineaire", action="store_true")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    inventaires = generer(args.nombre)
+    print(f"\nCatalogue de {sum(map(len, inventaires.values()))} produits "
+          f"généré en {time.perf_counter() - debut:.1f} s")
+    debut = time.perf_counter()
+    index = IndexRecherche(inventaires)
+    print(f"Index construit en {time.perf_counter() - debut:.1f} s\n")
+
+    for nom, requete in REQUETES:
+        duree, resultat = mediane(lambda: index.rechercher(**requete), args.repetitions)
+        ligne = f"  • {nom:30} : {resultat.total:7} trouvés  index {duree * 1000:8.2f} ms"
+        if not args.sans_lineaire:
+            duree_lineaire, (total, _) = mediane(lambda: lineaire(inventaires, **requete), 1)
+            assert total == resultat.total, (total, resultat.total)
+            ligne += f"  linéaire {duree_lineaire * 1000:8.0f} ms"
+        print(ligne)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+BENCHMARK DE STRESS DU REGISTRE DES SOLDES ET STOCKS
+====================================================
+
+Des travailleurs encaissent en parallèle des commandes tirées au hasard
+(un client, un produit) par le même chemin que l'application :
+PaymentStrategy.payer -> Client.debiter -> registre, sur des soldes et des
+stocks partagés et limités (une partie des commandes doit être refusée).
+À la fin, on vérifie qu'aucune mise à jour n'a été perdue :
+- solde final = solde initial - somme des paiements acceptés, et >= 0
+- stock final = stock initial - nombre de ventes acceptées, et >= 0
+
+Registres comparés :
+- naif    : l'ancien "vérifier puis soustraire", sans verrou (threads).
+            Une barrière entre la lecture et l'écriture fait vérifier tous
+            les travailleurs avant que l'un d'eux n'écrive : l'entrelacement
+            qui perd des mises à jour, que le GIL ne produit que rarement
+            de lui-même, se produit alors à chaque tour
+- memoire : registre.RegistreMemoire (threads), pour plusieurs nombres de verrous
+- sqlite  : stockage_sqlite.RegistreSQLite (processus)
+
+Avec le GIL de CPython, les threads n'exécutent pas de Python en parallèle :
+multiplier les verrous ne change guère le débit ici, il évite surtout que
+des paiements sans rapport s'attendent (build sans GIL, E/S sous verrou).
+SQLite n'accepte qu'une transaction d'écriture à la fois (BEGIN IMMEDIATE) :
+ajouter des processus ajoute de l'attente sur ce verrou, le débit baisse
+au lieu de monter. Le registre SQLite apporte la cohérence entre
+processus, pas la montée en charge.
+
+Usage :
+    python benchmarks/bench_registre.py
+    python benchmarks/bench_registre.py --commandes 100000 --travailleurs 1 2 4 8 --verrous 1 64
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from classes_boutiques import Client, CreditCardStrategy, Order, TicketHackathon
+from registre import RegistreMemoire
+from stockage_sqlite import RegistreSQLite
+
+
+class RegistreNaif(RegistreMemoire):
+    """Vérification puis débit sans verrou, comme les anciennes PaymentStrategy"""
+
+    def __init__(self, travailleurs):
+        super().__init__()
+        self._barriere = threading.Barrier(travailleurs)
+
+    def _attendre_les_autres(self):
+        try:
+            self._barriere.wait(timeout=0.1)
+        except threading.BrokenBarrierError:
+            pass    # un travailleur a terminé : plus de rendez-vous possible
+
+    def debiter(self, compte, montant_centimes, quantites=None):
+        quantites = quantites or {}
+        solde = self._soldes.get(compte, 0)
+        stocks = {p: self._stocks[p] for p in quantites}
+        if solde < montant_centimes or any(stocks[p] < q for p, q in quantites.items()):
+            return False
+        self._attendre_les_autres()
+        self._soldes[compte] = solde - montant_centimes
+        for p, q in quantites.items():
+            self._stocks[p] = stocks[p] - q
+        return True
+
+
+def preparer(registre, args):
+    soldes = {f"C{i}": args.solde for i in range(args.clients)}
+    stocks = {f"P{i}": args.stock for i in range(args.produits)}
+    for compte, centimes in soldes.items():
+        registre.ouvrir_compte(compte, centimes)
+    for id_produit, quantite in stocks.items():
+        registre.definir_stock(id_produit, quantite)
+    return soldes, stocks
+
+
+def generer_commandes(args):
+    aleatoire = random.Random(42)
+    return [(f"C{aleatoire.randrange(args.clients)}", f"P{aleatoire.randrange(args.produits)}",
+             aleatoire.randrange(100, 2000)) for _ in range(args.commandes)]
+
+
+def encaisser(registre, commandes):
+    """
+    Paie chaque commande avec PaymentStrategy.payer, comme l'application.
+    Les Client sont créés dans le travailleur (un processus ne peut pas les
+    recevoir) : leur compte existe déjà, ils ne font que s'y brancher.
+    Retourne les commandes acceptées.
+    """
+    strategie = CreditCardStrategy()
+    clients = {}
+    acceptees = []
+    for compte, produit, montant in commandes:
+        client = clients.get(compte)
+        if client is None:
+            client = clients[compte] = Client(compte, "Client", compte, None, 0, None,
+                                              payment_strategy=strategie, registre=registre)
+        order = Order("En attente", client, [TicketHackathon(produit, "Ticket", montant / 100)])
+        strategie.payer(client, order)
+        if order.statut == strategie.statut_paye:
+            acceptees.append((compte, produit, montant))
+    return acceptees
+
+
+def encaisser_processus(registre, commandes):
+    with open(os.devnull, "w") as nul, contextlib.redirect_stdout(nul):
+        return encaisser(registre, commandes)
+
+
+def verifier(registre, soldes, stocks, acceptees):
+    erreurs = 0
+    depenses = {}
+    ventes = {}
+    for compte, produit, montant in acceptees:
+        depenses[compte] = depenses.get(compte, 0) + montant
+        ventes[produit] = ventes.get(produit, 0) + 1
+    for compte, initial in soldes.items():
+        final = registre.solde(compte)
+        erreurs += final != initial - depenses.get(compte, 0) or final < 0
+    for produit, initial in stocks.items():
+        final = registre.stock(produit)
+        erreurs += final != initial - ventes.get(produit, 0) or final < 0
+    return erreurs
+
+
+def executer(nom, registre, soldes, stocks, commandes, travailleurs, executeur):
+    parts = [commandes[i::travailleurs] for i in range(travailleurs)]
+    fonction = encaisser_processus if executeur is ProcessPoolExecutor else encaisser
+    debut = time.perf_counter()
+    # Les messages de payer() ne sont pas affichés
+    with open(os.devnull, "w") as nul, contextlib.redirect_stdout(nul), \
+            executeur(max_workers=travailleurs) as pool:
+        acceptees = [c for part in pool.map(fonction, [registre] * travailleurs, parts) for c in part]
+    debit = len(commandes) / (time.perf_counter() - debut)
+    erreurs = verifier(registre, soldes, stocks, acceptees)
+    print(f"  • {nom:22} {travailleurs:2} trav. : {debit:9.0f} commandes/s  "
+          f"{len(acceptees):6} acceptées  "
+          f"{'OK' if erreurs == 0 else f'{erreurs} comptes/stocks incohérents'}")
+    return erreurs, debit
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test du registre des soldes et stocks")
+    parser.add_argument("--commandes", type=int, default=40000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--produits", type=int, default=20)
+    parser.add_argument("--solde", type=int, default=100000, help="solde initial en centimes")
+    parser.add_argument("--stock", type=int, default=1000)
+    parser.add_argument("--travailleurs", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--verrous", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--sans-sqlite", action="store_true")
+    args = parser.parse_args()
+
+    commandes = generer_commandes(args)
+    print(f"\n{args.commandes} commandes, {args.clients} clients, {args.produits} produits "
+          f"(stock {args.stock}) :")
+    erreurs_sures = 0
+    debits_sqlite = {}
+    for travailleurs in args.travailleurs:
+        registre = RegistreNaif(travailleurs)
+        executer("naif", registre, *preparer(registre, args), commandes, travailleurs,
+                 ThreadPoolExecutor)
+        for nombre_verrous in args.verrous:
+            registre = RegistreMemoire(nombre_verrous)
+            erreurs, _ = executer(f"memoire ({nombre_verrous} verrous)", registre,
+                                  *preparer(registre, args), commandes, travailleurs,
+                                  ThreadPoolExecutor)
+            erreurs_sures += erreurs
+        if not args.sans_sqlite:
+            with tempfile.TemporaryDirectory() as dossier:
+                registre = RegistreSQLite(os.path.join(dossier, "registre.db"))
+                erreurs, debits_sqlite[travailleurs] = executer(
+                    "sqlite (processus)", registre, *preparer(registre, args),
+                    commandes, travailleurs, ProcessPoolExecutor)
+                erreurs_sures += erreurs
+    if len(debits_sqlite) > 1:
+        print("\nsqlite : " + ", ".join(f"{debit:.0f}/s à {n} processus" for n, debit in debits_sqlite.items())
+              + "\n(une seule transaction d'écriture à la fois : plus de processus n'augmente pas le débit)")
+    if erreurs_sures:
+        sys.exit("Des mises à jour ont été perdues avec un registre sûr !")
+
+
+if __name__ == "__main__":
+    main()
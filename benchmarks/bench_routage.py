@@ -0,0 +1,312 @@
+"""
+BENCHMARK DU ROUTAGE - RÉSEAUX SYNTHÉTIQUES À L'ÉCHELLE DE LA FRANCE
+====================================================================
+
+Génère des réseaux ReseauHackathon reproductibles (graine fixe) et mesure :
+- calculer_itineraire sans et avec point intermédiaire
+- rechercher_lieux
+- generer_carte_interactive (+ rendu HTML folium), limité aux petits réseaux
+
+Deux générateurs :
+- "geometrique" : graphe géométrique aléatoire (points uniformes sur la France,
+  arête entre deux points proches)
+- "grille"      : réseau routier en grille perturbée, avec quelques lignes de
+  train longue distance
+
+Les résultats sont imprimés sous forme de tableau et peuvent être ajoutés à un
+fichier JSON Lines (une ligne par mesure, clés stables) pour suivre l'évolution
+dans le temps, et comparés à une exécution de référence.
+
+Usage :
+    python benchmarks/bench_routage.py
+    python benchmarks/bench_routage.py --tailles 1000 10000 100000 1000000
+    python benchmarks/bench_routage.py --sortie resultats.jsonl --reference ancien.jsonl
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import platform
+import random as rd
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from map_finale import (LieuHackathon, Position, ReseauHackathon,
+                        TypeHackathon)
+
+
+# Boîte englobante approximative de la France métropolitaine
+LAT_MIN, LAT_MAX = 42.3, 51.1
+LON_MIN, LON_MAX = -4.8, 8.2
+
+# Au-delà de cette distance, une connexion est considérée comme une ligne de train
+SEUIL_TRAIN_KM = 40
+
+CATEGORIES = list(TypeHackathon)
+
+
+# ============================================================================
+# GÉNÉRATEURS DE RÉSEAUX
+# ============================================================================
+
+def _ajouter_lieux(reseau: ReseauHackathon,
+                   points: List[Tuple[float, float]], graine: rd.Random):
+    """Ajoute un lieu par point, nommé G<i>"""
+    for i, (lat, lon) in enumerate(points):
+        reseau.ajouter_lieu(LieuHackathon(
+            f"G{i}", f"Ville{i // 50}", Position(lat, lon), graine.choice(CATEGORIES)
+        ))
+
+
+def _connecter(reseau: ReseauHackathon, points: List[Tuple[float, float]],
+               i: int, j: int, type_transport: str = None) -> int:
+    """Relie deux lieux ; le transport dépend de la distance si non précisé"""
+    distance = Position(*points[i]).distance_vol_oiseau(Position(*points[j]))
+    if type_transport is None:
+        type_transport = "train" if distance > SEUIL_TRAIN_KM else "voiture"
+    reseau.ajouter_connexion_bidirectionnelle(f"G{i}", f"G{j}", type_transport,
+                                              round(distance, 1))
+    return 1
+
+
+def generer_reseau_geometrique(nb_lieux: int, graine: int = 42,
+                               degre_moyen: float = 6.0) -> Tuple[ReseauHackathon, int]:
+    """
+    Graphe géométrique aléatoire : nb_lieux points uniformes sur la France,
+    reliés lorsqu'ils sont à moins d'un rayon r choisi pour obtenir
+    ~degre_moyen voisins. Les voisins sont cherchés par cases (hachage
+    spatial), donc la génération reste en O(n).
+    Retourne (réseau, nombre de connexions bidirectionnelles).
+    """
+    alea = rd.Random(graine)
+    reseau = ReseauHackathon()
+    points = [(alea.uniform(LAT_MIN, LAT_MAX), alea.uniform(LON_MIN, LON_MAX))
+              for _ in range(nb_lieux)]
+    _ajouter_lieux(reseau, points, alea)
+
+    surface = (LAT_MAX - LAT_MIN) * (LON_MAX - LON_MIN)
+    rayon = math.sqrt(degre_moyen * surface / (math.pi * nb_lieux))
+    rayon2 = rayon * rayon
+
+    cases: Dict[Tuple[int, int], List[int]] = {}
+    for i, (lat, lon) in enumerate(points):
+        cases.setdefault((int(lat / rayon), int(lon / rayon)), []).append(i)
+
+    nb_aretes = 0
+    for (cx, cy), indices in cases.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                voisins = cases.get((cx + dx, cy + dy))
+                if not voisins:
+                    continue
+                for i in indices:
+                    lat_i, lon_i = points[i]
+                    for j in voisins:
+                        if j <= i:
+                            continue
+                        lat_j, lon_j = points[j]
+                        if (lat_i - lat_j) ** 2 + (lon_i - lon_j) ** 2 <= rayon2:
+                            nb_aretes += _connecter(reseau, points, i, j)
+    return reseau, nb_aretes
+
+
+def generer_reseau_grille(nb_lieux: int, graine: int = 42,
+                          taux_coupure: float = 0.1,
+                          nb_lignes_train: int = None) -> Tuple[ReseauHackathon, int]:
+    """
+    Réseau routier en grille : côté x côté intersections légèrement décalées,
+    reliées à leurs voisins droite/bas (une route sur 1/taux_coupure est
+    supprimée), plus quelques lignes de train entre intersections éloignées.
+    Retourne (réseau, nombre de connexions bidirectionnelles).
+    """
+    alea = rd.Random(graine)
+    reseau = ReseauHackathon()
+    cote = max(2, int(math.isqrt(nb_lieux)))
+    pas_lat = (LAT_MAX - LAT_MIN) / cote
+    pas_lon = (LON_MAX - LON_MIN) / cote
+
+    points = []
+    for ligne in range(cote):
+        for colonne in range(cote):
+            points.append((
+                LAT_MIN + (ligne + alea.uniform(0.1, 0.9)) * pas_lat,
+                LON_MIN + (colonne + alea.uniform(0.1, 0.9)) * pas_lon,
+            ))
+    _ajouter_lieux(reseau, points, alea)
+
+    nb_aretes = 0
+    for ligne in range(cote):
+        for colonne in range(cote):
+            i = ligne * cote + colonne
+            if colonne + 1 < cote and alea.random() >= taux_coupure:
+                nb_aretes += _connecter(reseau, points, i, i + 1, "voiture")
+            if ligne + 1 < cote and alea.random() >= taux_coupure:
+                nb_aretes += _connecter(reseau, points, i, i + cote, "voiture")
+
+    if nb_lignes_train is None:
+        nb_lignes_train = max(1, len(points) // 100)
+    for _ in range(nb_lignes_train):
+        i, j = alea.sample(range(len(points)), 2)
+        nb_aretes += _connecter(reseau, points, i, j, "train")
+    return reseau, nb_aretes
+
+
+GENERATEURS: Dict[str, Callable[..., Tuple[ReseauHackathon, int]]] = {
+    "geometrique": generer_reseau_geometrique,
+    "grille": generer_reseau_grille,
+}
+
+
+# ============================================================================
+# MESURES
+# ============================================================================
+
+def _chronometrer(fonction: Callable[[], object], repetitions: int) -> List[float]:
+    """Retourne les durées (ms) de `repetitions` appels"""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
+
+
+def _resume(durees: List[float]) -> Dict[str, float]:
+    durees = sorted(durees)
+    return {
+        "min_ms": round(durees[0], 4),
+        "mediane_ms": round(statistics.median(durees), 4),
+        "p95_ms": round(durees[min(len(durees) - 1, int(0.95 * len(durees)))], 4),
+        "max_ms": round(durees[-1], 4),
+    }
+
+
+def mesurer_reseau(generateur: str, nb_lieux: int, graine: int,
+                   repetitions: int, taille_max_carte: int) -> List[Dict]:
+    """Exécute toutes les mesures pour un réseau et retourne une ligne par mesure"""
+    rd.seed(graine)  # le bruit de Connexion.calculer_temps_trajet utilise le module random
+    debut = time.perf_counter()
+    reseau, nb_aretes = GENERATEURS[generateur](nb_lieux, graine)
+    duree_construction = (time.perf_counter() - debut) * 1000
+
+    noms = [lieu.nom for lieu in reseau.get_tous_lieux()]
+    alea = rd.Random(graine + 1)
+    requetes = [tuple(alea.sample(noms, 3)) for _ in range(repetitions)]
+    commun = {"generateur": generateur, "noeuds": len(noms),
+              "aretes": nb_aretes, "graine": graine}
+    lignes = [dict(commun, mesure="construction", repetitions=1,
+                   **_resume([duree_construction]))]
+
+    def mesurer_itineraires(nom_mesure: str, avec_intermediaire: bool):
+        reseau.activer_instrumentation()
+        durees, visites, trouves = [], [], 0
+        for depart, inter, arrivee in requetes:
+            debut = time.perf_counter()
+            resultat = reseau.calculer_itineraire(
+                depart, arrivee, inter if avec_intermediaire else None)
+            durees.append((time.perf_counter() - debut) * 1000)
+            visites.append(resultat.metriques.noeuds_visites)
+            trouves += resultat.trouve
+        lignes.append(dict(commun, mesure=nom_mesure, repetitions=len(requetes),
+                           noeuds_visites_moyen=round(statistics.mean(visites), 1),
+                           taux_trouve=round(trouves / len(requetes), 3),
+                           **_resume(durees)))
+
+    mesurer_itineraires("itineraire", avec_intermediaire=False)
+    mesurer_itineraires("itineraire_intermediaire", avec_intermediaire=True)
+
+    termes = iter([f"G{alea.randrange(len(noms))}" for _ in range(repetitions)])
+    lignes.append(dict(commun, mesure="recherche", repetitions=repetitions,
+                       **_resume(_chronometrer(
+                           lambda: reseau.rechercher_lieux(next(termes)), repetitions))))
+
+    if len(noms) <= taille_max_carte:
+        reseau.activer_instrumentation(False)
+        itineraire = reseau.calculer_itineraire(*requetes[0][::2])
+
+        def generer_carte():
+            reseau.generer_carte_interactive(itineraire).get_root().render()
+
+        lignes.append(dict(commun, mesure="carte", repetitions=1,
+                           **_resume(_chronometrer(generer_carte, 1))))
+    return lignes
+
+
+# ============================================================================
+# RAPPORT
+# ============================================================================
+
+def _cle(ligne: Dict) -> Tuple:
+    return (ligne["generateur"], ligne["noeuds"], ligne["graine"], ligne["mesure"])
+
+
+def afficher_tableau(lignes: List[Dict], reference: Dict[Tuple, Dict]):
+    """Affiche les résultats, avec le ratio par rapport à la référence si fournie"""
+    print(f"\n{'générateur':12} {'nœuds':>8} {'arêtes':>9} {'mesure':26} "
+          f"{'médiane ms':>11} {'p95 ms':>10} {'visités':>9} {'vs réf':>7}")
+    print("-" * 100)
+    for ligne in lignes:
+        ancien = reference.get(_cle(ligne))
+        ratio = (f"{ligne['mediane_ms'] / ancien['mediane_ms']:.2f}x"
+                 if ancien and ancien["mediane_ms"] else "")
+        print(f"{ligne['generateur']:12} {ligne['noeuds']:>8} {ligne['aretes']:>9} "
+              f"{ligne['mesure']:26} {ligne['mediane_ms']:>11.3f} {ligne['p95_ms']:>10.3f} "
+              f"{ligne.get('noeuds_visites_moyen', ''):>9} {ratio:>7}")
+
+
+def charger_reference(chemin: str) -> Dict[Tuple, Dict]:
+    """Charge un fichier JSON Lines ; en cas de doublons, la dernière mesure gagne"""
+    reference = {}
+    with open(chemin, encoding="utf-8") as fichier:
+        for ligne in fichier:
+            if ligne.strip():
+                mesure = json.loads(ligne)
+                reference[_cle(mesure)] = mesure
+    return reference
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du routage ReseauHackathon")
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="nombres de lieux à générer (jusqu'à 1000000)")
+    parser.add_argument("--generateurs", nargs="+", choices=sorted(GENERATEURS),
+                        default=sorted(GENERATEURS))
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--repetitions", type=int, default=20,
+                        help="nombre de requêtes par mesure")
+    parser.add_argument("--taille-max-carte", type=int, default=10000,
+                        help="n'exécute la génération de carte folium que jusqu'à cette taille")
+    parser.add_argument("--sortie", help="fichier JSON Lines où ajouter les résultats")
+    parser.add_argument("--reference", help="fichier JSON Lines d'une exécution précédente")
+    args = parser.parse_args()
+
+    reference = charger_reference(args.reference) if args.reference else {}
+    contexte = {"date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine()}
+
+    lignes = []
+    for generateur in args.generateurs:
+        for taille in args.tailles:
+            print(f"⚙️  {generateur} - {taille} lieux...", flush=True)
+            lignes.extend(mesurer_reseau(generateur, taille, args.graine,
+                                         args.repetitions, args.taille_max_carte))
+
+    afficher_tableau(lignes, reference)
+
+    if args.sortie:
+        with open(args.sortie, "a", encoding="utf-8") as fichier:
+            for ligne in lignes:
+                fichier.write(json.dumps(dict(contexte, **ligne), ensure_ascii=False) + "\n")
+        print(f"\n✅ {len(lignes)} mesures ajoutées à {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
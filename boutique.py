@@ -1,89 +1,187 @@
-import pandas as pd
 import csv
+import os
 from classes_boutiques import *
-
+from cache_catalogue import ecrire_snapshot, empreinte_source, lire_snapshot
+
+
+
+# ============================
+#   CHARGEMENT DU CATALOGUE
+# ============================
+
+# Par catégorie : fichier CSV, classe d'inventaire, méthode de la Factory, colonnes
+# dans l'ordre des arguments de cette méthode, et type de chaque colonne (lu
+# directement par pandas).
+CATEGORIES = {
+    "boisson": ("boisson.csv", Inventaire_boisson, "create_Boisson",
+                {"id": str, "nom": str, "volume": "float64", "prix": "float64", "image_path": str}),
+    "food": ("food.csv", Inventaire_food, "create_Food",
+             {"id": str, "nom": str, "prix": "float64", "image_path": str}),
+    "vetement": ("vetement.csv", Inventaire_vetement, "create_Vetement",
+                 {"id": str, "nom": str, "prix": "float64", "taille": str, "image_path": str}),
+    "tech": ("tech.csv", Inventaire_tech, "create_Tech",
+             {"id": str, "nom": str, "prix": "float64", "garantie": "int64", "image_path": str}),
+    "developpeur": ("developpeur.csv", Inventaire_developpeur, "create_Developpeur",
+                    {"id": str, "nom": str, "prix": "float64", "niveau": str, "image_path": str}),
+    "ticket": ("ticket.csv", Inventaire_ticket, "create_TicketHackathon",
+               {"id": str, "nom": str, "prix": "float64", "image_path": str}),
+}
+
+DOSSIER_CSV = "./dossiercsv"
+
+
+def lire_csv_categorie(categorie, chemin=None):
+    """
+    Lit le CSV d'une catégorie avec les types de colonnes fixés
+    (pas d'inférence, chaînes vides conservées telles quelles).
+    """
+    import pandas as pd  # import coûteux : seulement si le CSV doit vraiment être analysé
+
+    fichier, _, _, colonnes = CATEGORIES[categorie]
+    if chemin is None:
+        chemin = os.path.join(DOSSIER_CSV, fichier)
+    return pd.read_csv(chemin, sep=";", usecols=list(colonnes), dtype=colonnes,
+                       keep_default_na=False)
+
+
+def lire_colonnes_categorie(categorie, chemin=None, cache=True):
+    """
+    Colonnes de `categorie` sous forme de dict colonne -> liste Python.
+    Avec `cache`, l'instantané binaire à côté du CSV est utilisé s'il est
+    à jour, et (ré)écrit sinon après lecture du CSV.
+    """
+    fichier, _, _, colonnes = CATEGORIES[categorie]
+    if chemin is None:
+        chemin = os.path.join(DOSSIER_CSV, fichier)
+    if cache:
+        valeurs = lire_snapshot(chemin, colonnes)
+        if valeurs is not None:
+            return valeurs
+        source = empreinte_source(chemin)   # avant la lecture, voir ecrire_snapshot
+    df = lire_csv_categorie(categorie, chemin)
+    valeurs = {c: df[c].tolist() for c in colonnes}
+    if cache:
+        ecrire_snapshot(chemin, colonnes, valeurs, source)
+    return valeurs
+
+
+def charger_categorie(inventaire, categorie, df=None, chemin=None, cache=True):
+    """
+    Remplit `inventaire` avec les produits de `categorie`.
+    Chaque colonne est convertie en une fois en liste Python (ou relue depuis
+    le cache binaire), puis les produits sont créés par la Factory ligne à ligne
+    sur ces listes (pas de Series par ligne).
+    """
+    if df is None:
+        valeurs = lire_colonnes_categorie(categorie, chemin, cache)
+    else:
+        valeurs = {c: df[c].tolist() for c in CATEGORIES[categorie][3]}
+    return creer_produits(inventaire, categorie, valeurs)
+
+
+def creer_produits(inventaire, categorie, valeurs):
+    """
+    Crée par la Factory les produits décrits par `valeurs` (dict colonne -> liste)
+    et les ajoute à `inventaire`.
+    """
+    _, _, methode, colonnes = CATEGORIES[categorie]
+    creer = getattr(Factory(), methode)
+    inventaire.ajouter_produits(creer(*ligne) for ligne in zip(*(valeurs[c] for c in colonnes)))
+    return inventaire
+
+
+class Catalogue:
+    """
+    Accès paresseux au catalogue : rien n'est lu à la création.
+    Chaque catégorie est chargée à sa première demande, et son CSV
+    n'est lu qu'une seule fois (ou pas du tout si son cache binaire est à jour).
+    """
+
+    def __init__(self, dossier=DOSSIER_CSV, cache=True, stockage=None):
+        self.dossier = dossier
+        self.cache = cache
+        # Avec un stockage (ex : StockageSQLite), les catégories sont lues dans la
+        # base au lieu des CSV, et les inventaires y répercutent leurs modifications
+        self.stockage = stockage
+        self._inventaires = {}
+        self._total = None
+        self._recherche = None
+        self._signature_recherche = None
+
+    def inventaire(self, categorie):
+        """Inventaire de `categorie` (chargé au premier appel)."""
+        inventaire = self._inventaires.get(categorie)
+        if inventaire is None:
+            fichier, classe, _, colonnes = CATEGORIES[categorie]
+            inventaire = classe()
+            if self.stockage is not None:
+                creer_produits(inventaire, categorie, self.stockage.lire_colonnes(categorie, colonnes))
+                inventaire.stockage = self.stockage
+            else:
+                charger_categorie(inventaire, categorie, chemin=os.path.join(self.dossier, fichier),
+                                  cache=self.cache)
+            self._inventaires[categorie] = inventaire
+        return inventaire
+
+    def est_charge(self, categorie):
+        return categorie in self._inventaires
+
+    def total(self):
+        """Vue Inventaire_totale sur toutes les catégories (les charge toutes)."""
+        if self._total is None:
+            self._total = Inventaire_totale()
+            self._total.construire_depuis_inventaires(
+                *(self.inventaire(categorie) for categorie in CATEGORIES))
+        return self._total
+
+    def recherche(self):
+        """
+        Index de recherche (recherche.IndexRecherche) sur toutes les catégories
+        (les charge toutes). Il est reconstruit si un inventaire a changé depuis :
+        tout ajout incrémente son compteur, toute suppression réduit sa taille.
+        """
+        from recherche import IndexRecherche
+
+        inventaires = {categorie: self.inventaire(categorie) for categorie in CATEGORIES}
+        signature = [(inv._compteur, len(inv)) for inv in inventaires.values()]
+        if self._recherche is None or signature != self._signature_recherche:
+            self._recherche = IndexRecherche(inventaires)
+            self._signature_recherche = signature
+        return self._recherche
+
+
+# Catalogue partagé par l'application
+catalogue = Catalogue()
 
 
 def create_boisson_from_csv(Inventaire_boisson, df):
-    factory = Factory()
-    for index, row in df.iterrows():
-        product = factory.create_Boisson(
-            row['id'], row['nom'], row['volume'], row['prix'], row['image_path']
-        )
-        Inventaire_boisson.ajouter_produit(product)
-
-        
-test2 = pd.read_csv("./dossiercsv/food.csv",sep=";")
-def create_food_from_csv(Inventaire_food,test2):
-    factory = Factory()
-    
-    for index, row in test2.iterrows():
-        product = factory.create_Food(row['id'], row['nom'], row['prix'], row['image_path'])
+    charger_categorie(Inventaire_boisson, "boisson", df)
 
-        Inventaire_food.ajouter_produit(product)
-    
 
-test3 = pd.read_csv("./dossiercsv/vetement.csv",sep=";")
-def create_vetement_from_csv(Inventaire_vetement,test3):
-    factory = Factory()
+def create_food_from_csv(Inventaire_food, df):
+    charger_categorie(Inventaire_food, "food", df)
 
-    
-    for index, row in test3.iterrows():
-        product = factory.create_Vetement(row['id'], row['nom'], row['prix'], row['taille'], row['image_path'])
 
-        Inventaire_vetement.ajouter_produit(product)
-    
+def create_vetement_from_csv(Inventaire_vetement, df):
+    charger_categorie(Inventaire_vetement, "vetement", df)
 
 
-test4 = pd.read_csv("./dossiercsv/tech.csv",sep=";")
-def create_tech_from_csv(Inventaire_tech,test4):
-    factory = Factory()
-    
-    for index, row in test4.iterrows():
-        product = factory.create_Tech(row['id'], row['nom'], row['prix'],row['garantie'], row['image_path'])
+def create_tech_from_csv(Inventaire_tech, df):
+    charger_categorie(Inventaire_tech, "tech", df)
 
-        Inventaire_tech.ajouter_produit(product)
-    
 
+def create_developpeur_from_csv(Inventaire_developpeur, df):
+    charger_categorie(Inventaire_developpeur, "developpeur", df)
 
-test5 = pd.read_csv("./dossiercsv/developpeur.csv",sep=";")
-def create_developpeur_from_csv(Inventaire_developpeur,test5):
-    factory = Factory()
-    
-    for index, row in test5.iterrows():
-        product = factory.create_Developpeur(row['id'], row['nom'], row['prix'], row['niveau'], row['image_path'])
 
-        Inventaire_developpeur.ajouter_produit(product)
-    
- 
-test6 = pd.read_csv("./dossiercsv/ticket.csv",sep=";")
-def create_ticket_from_csv(Inventaire_ticket,test6):
-    factory = Factory()
-    
-    for index, row in test6.iterrows():
-        product = factory.create_TicketHackathon(row['id'], row['nom'], row['prix'], row['image_path'])
+def create_ticket_from_csv(Inventaire_ticket, df):
+    charger_categorie(Inventaire_ticket, "ticket", df)
 
-        Inventaire_ticket.ajouter_produit(product)
-    
-if True:
-    
 
+def demo():
     print("=== Test Complet du Catalogue Hackathon ===")
-    # Création inventaires
-    inv_boisson = Inventaire_boisson()
-    inv_food = Inventaire_food()
-    inv_vetement = Inventaire_vetement()
-    inv_tech = Inventaire_tech()
-    inv_dev = Inventaire_developpeur()
-    inv_ticket = Inventaire_ticket()
-
-    # Chargement CSV
-    create_boisson_from_csv(inv_boisson, pd.read_csv("./dossiercsv/boisson.csv", sep=";"))
-    create_food_from_csv(inv_food, pd.read_csv("./dossiercsv/food.csv", sep=";"))
-    create_vetement_from_csv(inv_vetement, pd.read_csv("./dossiercsv/vetement.csv", sep=";"))
-    create_tech_from_csv(inv_tech, pd.read_csv("./dossiercsv/tech.csv", sep=";"))
-    create_developpeur_from_csv(inv_dev, pd.read_csv("./dossiercsv/developpeur.csv", sep=";"))
-    create_ticket_from_csv(inv_ticket, pd.read_csv("./dossiercsv/ticket.csv", sep=";"))
+    # Chargement CSV (une lecture par fichier)
+    inv_boisson = catalogue.inventaire("boisson")
 
     
     # Vérifier le contenu des inventaires
@@ -92,8 +190,7 @@ if True:
         print(p.info(), end="")
 
     # Inventaire total
-    inv_total = Inventaire_totale()
-    inv_total.construire_depuis_inventaires(inv_boisson, inv_food, inv_vetement, inv_tech, inv_dev, inv_ticket)
+    inv_total = catalogue.total()
 
     # Tri par nom puis affichage total
     inv_total.trier_par_nom()
@@ -124,10 +221,14 @@ if True:
 
     client.process_payment()
 
-    # Vérification CSV
-    with open(client.filepath_csv, "r") as f:
+    # Vérification CSV (le fichier peut avoir été écrit sous Windows en cp1252)
+    with open(client.filepath_csv, "r", errors="replace") as f:
         print(f.read())
 
     # Vérification inventaire interne
     for p in client.inventaire:
         print(p.info(), end="")
+
+
+if __name__ == "__main__":
+    demo()
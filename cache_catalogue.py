@@ -0,0 +1,171 @@
+"""
+Cache binaire du catalogue.
+
+Pour chaque CSV de dossiercsv/, un instantané <fichier>.snap est écrit à côté
+du CSV après le premier chargement. Il contient les colonnes déjà converties :
+- colonnes numériques : tableaux array ('d' pour float64, 'q' pour int64)
+- colonnes texte      : chaînes UTF-8 séparées par un octet nul
+
+Un en-tête JSON décrit la source (taille, mtime, sha256) et l'emplacement des
+colonnes. Au lancement suivant, si le CSV n'a pas changé, les colonnes sont
+relues par memory-mapping de l'instantané, sans pandas ni analyse du CSV.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+
+MAGIC = b"HKCAT1\n"
+VERSION = 1
+EXTENSION = ".snap"
+
+# dtype pandas (voir boutique.CATEGORIES) -> code de type array
+TYPES_NUMERIQUES = {"float64": "d", "int64": "q"}
+
+_ENTETE = struct.Struct("<I")   # longueur de l'en-tête JSON
+_ALIGNEMENT = 8
+
+
+def chemin_snapshot(chemin_csv):
+    return chemin_csv + EXTENSION
+
+
+def empreinte_source(chemin_csv, avec_hash=True):
+    """Taille, date de modification et (optionnellement) sha256 du CSV."""
+    stat = os.stat(chemin_csv)
+    empreinte = {"taille": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if avec_hash:
+        sha = hashlib.sha256()
+        with open(chemin_csv, "rb") as fichier:
+            for bloc in iter(lambda: fichier.read(1 << 20), b""):
+                sha.update(bloc)
+        empreinte["sha256"] = sha.hexdigest()
+    return empreinte
+
+
+def _source_inchangee(chemin_csv, source):
+    """
+    Même taille et même mtime : le CSV est considéré inchangé sans le relire.
+    Même taille mais mtime différent (copie, checkout...) : on compare le sha256.
+    """
+    actuelle = empreinte_source(chemin_csv, avec_hash=False)
+    if actuelle["taille"] != source["taille"]:
+        return False
+    if actuelle["mtime_ns"] == source["mtime_ns"]:
+        return True
+    return empreinte_source(chemin_csv)["sha256"] == source["sha256"]
+
+
+def _type_colonne(dtype):
+    return TYPES_NUMERIQUES.get(dtype, "str")
+
+
+def ecrire_snapshot(chemin_csv, colonnes, valeurs, source):
+    """
+    Écrit l'instantané de `valeurs` (dict colonne -> liste) pour le CSV donné.
+    `colonnes` : dict colonne -> dtype, comme dans boutique.CATEGORIES.
+    `source` : empreinte_source(chemin_csv) prise AVANT de lire le CSV. Si le
+    CSV change pendant la lecture, l'empreinte ne correspond plus et
+    l'instantané sera ignoré, au lieu d'associer des données périmées à
+    l'empreinte du nouveau fichier.
+    Retourne False si l'instantané n'a pas pu être écrit (le cache est optionnel).
+    """
+    blocs = []
+    description = []
+    position = 0
+    for nom, dtype in colonnes.items():
+        code = _type_colonne(dtype)
+        if code == "str":
+            textes = ["" if v is None else str(v) for v in valeurs[nom]]
+            if any("\0" in t for t in textes):
+                return False
+            bloc = "\0".join(textes).encode("utf-8")
+        else:
+            bloc = array(code, valeurs[nom]).tobytes()
+        description.append([nom, code, position, len(bloc)])
+        bourrage = -len(bloc) % _ALIGNEMENT
+        blocs.append(bloc + b"\0" * bourrage)
+        position += len(bloc) + bourrage
+
+    entete = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "source": source,
+        "lignes": len(next(iter(valeurs.values()), [])),
+        "colonnes": description,
+    }).encode("utf-8")
+    debut_donnees = len(MAGIC) + _ENTETE.size + len(entete)
+    bourrage_entete = -debut_donnees % _ALIGNEMENT
+
+    chemin = chemin_snapshot(chemin_csv)
+    # Nom temporaire unique : plusieurs processus peuvent écrire en même temps
+    try:
+        descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin) or ".",
+                                                   prefix=os.path.basename(chemin) + ".",
+                                                   suffix=".tmp")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(descripteur, "wb") as fichier:
+            fichier.write(MAGIC)
+            fichier.write(_ENTETE.pack(len(entete) + bourrage_entete))
+            fichier.write(entete + b" " * bourrage_entete)
+            for bloc in blocs:
+                fichier.write(bloc)
+        os.replace(temporaire, chemin)
+    except OSError:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        return False
+    return True
+
+
+def lire_snapshot(chemin_csv, colonnes):
+    """
+    Relit les colonnes depuis l'instantané s'il est valide pour le CSV actuel,
+    sinon retourne None (instantané absent, obsolète ou d'un autre format).
+    """
+    chemin = chemin_snapshot(chemin_csv)
+    try:
+        with open(chemin, "rb") as fichier, \
+                mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as carte:
+            return _decoder(carte, chemin_csv, colonnes)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _decoder(carte, chemin_csv, colonnes):
+    if carte[:len(MAGIC)] != MAGIC:
+        return None
+    taille_entete, = _ENTETE.unpack_from(carte, len(MAGIC))
+    debut_entete = len(MAGIC) + _ENTETE.size
+    entete = json.loads(carte[debut_entete:debut_entete + taille_entete])
+    if entete["version"] != VERSION or entete["byteorder"] != sys.byteorder:
+        return None
+    attendues = [[nom, _type_colonne(dtype)] for nom, dtype in colonnes.items()]
+    if [c[:2] for c in entete["colonnes"]] != attendues:
+        return None
+    if not _source_inchangee(chemin_csv, entete["source"]):
+        return None
+
+    debut_donnees = debut_entete + taille_entete
+    lignes = entete["lignes"]
+    valeurs = {}
+    with memoryview(carte) as vue:
+        for nom, code, position, longueur in entete["colonnes"]:
+            debut = debut_donnees + position
+            if code == "str":
+                colonne = str(vue[debut:debut + longueur], "utf-8").split("\0") if lignes else []
+            else:
+                with vue[debut:debut + longueur] as bloc, bloc.cast(code) as nombres:
+                    colonne = nombres.tolist()
+            if len(colonne) != lignes:
+                return None
+            valeurs[nom] = colonne
+    return valeurs
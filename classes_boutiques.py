@@ -1,6 +1,17 @@
 from classes_frontend import *
 from abc import ABC, abstractmethod
 import csv
+import os
+import shutil
+import sys
+import tempfile
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+import heapq
+from itertools import islice
+import atexit
+import queue
+import threading
 
 # ============================
 #       CLASSES PRODUITS
@@ -8,6 +19,9 @@ import csv
 
 
 class Produit(ABC):
+    # Pas de __dict__ par instance : le catalogue peut compter des centaines de milliers de produits
+    __slots__ = ('id', 'nom', 'prix', 'image_path')
+
     def __init__(self, id , nom, prix, image_path=None):
         self.id = id
         self.nom = nom
@@ -21,21 +35,23 @@ class Produit(ABC):
 
 
 class Alimentaire(Produit):
-    pass
+    __slots__ = ()
 
 class Electronique(Produit):
-    pass
+    __slots__ = ()
 
 class Humain(Produit):
-    pass
+    __slots__ = ()
 
 class Autre(Produit):
-    pass
+    __slots__ = ()
 
 
 
 
 class Boisson(Alimentaire):
+    __slots__ = ('volume',)
+
     def __init__(self, id , nom, prix, volume, image_path=None):
         super().__init__(id, nom, prix, image_path)
         self.volume = volume    
@@ -45,6 +61,8 @@ class Boisson(Alimentaire):
 
 
 class Food(Alimentaire):
+    __slots__ = ()
+
     def __init__(self, id,  nom, prix, image_path=None):
         super().__init__(id, nom, prix, image_path)
 
@@ -53,6 +71,8 @@ class Food(Alimentaire):
 
 
 class Vetement(Autre):
+    __slots__ = ('taille',)
+
     def __init__(self, id,  nom, prix, taille, image_path=None):
         super().__init__(id , nom, prix, image_path)
         self.taille = taille
@@ -62,6 +82,8 @@ class Vetement(Autre):
 
 
 class Tech(Electronique):
+    __slots__ = ('garantie',)
+
     def __init__(self,id, nom, prix, garantie, image_path=None):
         super().__init__(id, nom, prix, image_path)
         self.garantie = garantie
@@ -71,6 +93,8 @@ class Tech(Electronique):
 
 
 class Developpeur(Humain):
+    __slots__ = ('niveau',)
+
     def __init__(self,id, nom, prix, niveau, image_path=None):
         super().__init__(id,nom, prix, image_path)
         self.niveau = niveau
@@ -80,6 +104,8 @@ class Developpeur(Humain):
 
 
 class TicketHackathon(Autre):
+    __slots__ = ()
+
     def __init__(self,id, nom, prix, image_path=None):
         super().__init__(id,nom, prix, image_path)
 
@@ -88,66 +114,34 @@ class TicketHackathon(Autre):
 
 
 
+def en_centimes(prix):
+    """Prix en euros -> nombre entier de centimes (les sommes restent exactes)."""
+    return round(prix * 100)
+
+
+def _partager(valeur):
+    """
+    Interne les chaînes très répétées (taille, niveau, chemin d'image) :
+    tous les produits qui ont la même valeur pointent vers un seul objet.
+    """
+    return sys.intern(valeur) if isinstance(valeur, str) else valeur
+
+
 class Factory() :
     def create_Boisson(self, id, nom, volume, prix, image_path):
         # Conversion explicite pour éviter les erreurs de type
-        return Boisson(id, nom, float(prix), float(volume), image_path)
+        return Boisson(id, nom, float(prix), float(volume), _partager(image_path))
     def create_Food(self, id, nom, prix, image_path):
-        return Food(id, nom, float(prix), image_path)
+        return Food(id, nom, float(prix), _partager(image_path))
     def create_Vetement(self, id, nom, prix, taille, image_path):
-        return Vetement(id, nom, float(prix), taille, image_path)
+        return Vetement(id, nom, float(prix), _partager(taille), _partager(image_path))
     def create_Tech(self, id, nom, prix, garantie, image_path):
-        return Tech(id, nom, float(prix), int(garantie), image_path) 
+        return Tech(id, nom, float(prix), int(garantie), _partager(image_path)) 
     def create_Developpeur(self, id, nom, prix, niveau, image_path):
-        return Developpeur(id, nom, float(prix), niveau, image_path)
+        return Developpeur(id, nom, float(prix), _partager(niveau), _partager(image_path))
     def create_TicketHackathon(self, id, nom, prix, image_path):
-        return TicketHackathon(id, nom, float(prix), image_path)
-
-
-
-def fusion(liste_gauche, liste_droite, key):
-    """
-    Fusionne deux listes déjà triées (liste_gauche et liste_droite)
-    en une seule liste triée, selon la clé 'key'.
-    """
-    resultat = []
-    i = 0  # index pour liste_gauche
-    j = 0  # index pour liste_droite
-
-    # Tant qu'il reste des éléments dans les deux listes
-    while i < len(liste_gauche) and j < len(liste_droite):
-        if key(liste_gauche[i]) <= key(liste_droite[j]):
-            resultat.append(liste_gauche[i])
-            i += 1
-        else:
-            resultat.append(liste_droite[j])
-            j += 1
-
-    # Il peut rester des éléments dans l'une des deux listes
-    while i < len(liste_gauche):
-        resultat.append(liste_gauche[i])
-        i += 1
+        return TicketHackathon(id, nom, float(prix), _partager(image_path))
 
-    while j < len(liste_droite):
-        resultat.append(liste_droite[j])
-        j += 1
-
-    return resultat
-def merge_sort(liste, key):
-    """
-    Implémentation du tri par fusion.
-    - liste : liste d'objets à trier
-    - key   : fonction qui prend un élément et renvoie la clé de comparaison
-    Retourne une nouvelle liste triée.
-    """
-    if len(liste) <= 1:
-        return liste  # déjà triée
-
-    milieu = len(liste) // 2
-    gauche = merge_sort(liste[:milieu], key)
-    droite = merge_sort(liste[milieu:], key)
-
-    return fusion(gauche, droite, key)
 
 
 # ============================
@@ -155,8 +149,144 @@ def merge_sort(liste, key):
 # ============================
 
 class Inventaire(ABC):
+    # Clés de tri disponibles. Chaque clé est calculée une seule fois par produit,
+    # à l'insertion dans la vue triée correspondante.
+    CLES_TRI = {
+        "nom": lambda p: str(p.nom).lower(),
+        "prix": lambda p: float(p.prix),
+    }
+
     def __init__(self):
-        self.liste = []
+        # Index id -> produit ; un dict conserve l'ordre d'insertion,
+        # donc ajout, recherche et suppression se font en O(1)
+        self._produits = {}
+        # Vues triées, construites à la première demande puis tenues à jour
+        # par bisect : nom de clé -> liste triée de (clé, rang, id)
+        self._vues = {}
+        self._rangs = {}      # id -> rang d'insertion (départage les égalités : tri stable)
+        self._compteur = 0
+        self._ordre = None    # clé de tri courante, None = ordre d'insertion
+        # Stockage optionnel (ex : StockageSQLite) où répercuter ajouts et suppressions
+        self.stockage = None
+        self._lot = 0         # > 0 : écritures groupées, validées à la fin du lot
+
+    @contextmanager
+    def _lot_stockage(self):
+        """
+        Groupe les écritures d'une opération en masse (ajouter_produits,
+        liste = ...) : elles sont validées dans le stockage (visibles des
+        autres connexions) en une seule transaction à la fin du lot.
+        """
+        self._lot += 1
+        try:
+            yield
+        finally:
+            self._lot -= 1
+            if not self._lot:
+                self.stockage.valider()
+
+    def _valider_stockage(self):
+        # Hors lot, chaque ajout / suppression est validé aussitôt
+        if not self._lot:
+            self.stockage.valider()
+
+    def _id(self, produit):
+        return produit.id
+
+    def _indexer(self, produit):
+        id_produit = self._id(produit)
+        if id_produit in self._produits:
+            # En mémoire seulement : la ligne du stockage est remplacée ci-dessous
+            self._retirer(id_produit)
+        self._produits[id_produit] = produit
+        self._rangs[id_produit] = self._compteur
+        self._compteur += 1
+        for nom, vue in self._vues.items():
+            insort(vue, (self.CLES_TRI[nom](produit), self._rangs[id_produit], id_produit))
+        if self.stockage is not None:
+            self.stockage.ajouter_produits([produit])
+            self._valider_stockage()
+
+    def _desindexer(self, id_produit):
+        if self._retirer(id_produit) is None:
+            return False
+        if self.stockage is not None:
+            self.stockage.supprimer_produit(id_produit)
+            self._valider_stockage()
+        return True
+
+    def _retirer(self, id_produit):
+        """Retire le produit de l'index et des vues triées. Retourne le produit, ou None."""
+        produit = self._produits.pop(id_produit, None)
+        if produit is None:
+            return None
+        rang = self._rangs.pop(id_produit)
+        for nom, vue in self._vues.items():
+            entree = (self.CLES_TRI[nom](produit), rang, id_produit)
+            i = bisect_left(vue, entree)
+            if i < len(vue) and vue[i] == entree:
+                del vue[i]
+            else:
+                # Le produit a été modifié depuis son insertion : recherche linéaire
+                self._vues[nom] = [e for e in vue if e[2] != id_produit]
+        return produit
+
+    def _vue(self, nom):
+        """Vue triée selon la clé `nom`, construite au premier appel."""
+        vue = self._vues.get(nom)
+        if vue is None:
+            cle = self.CLES_TRI[nom]
+            vue = sorted((cle(p), self._rangs[i], i) for i, p in self._produits.items())
+            self._vues[nom] = vue
+        return vue
+
+    @property
+    def liste(self):
+        """Produits de l'inventaire, dans l'ordre de tri courant (copie)."""
+        if self._ordre is None:
+            return list(self._produits.values())
+        return [self._produits[e[2]] for e in self._vue(self._ordre)]
+
+    @liste.setter
+    def liste(self, produits):
+        anciens = list(self._produits.values())
+        self._produits = {}
+        self._vues = {}
+        self._rangs = {}
+        if self.stockage is None:
+            for p in produits:
+                self._indexer(p)
+            return
+        produits = list(produits)
+        with self._lot_stockage():
+            # Le stockage doit refléter la nouvelle liste : les lignes des
+            # catégories concernées sont effacées avant d'écrire les produits
+            self.stockage.vider_categories(anciens + produits)
+            for p in produits:
+                self._indexer(p)
+
+    def __len__(self):
+        return len(self._produits)
+
+    def __iter__(self):
+        return iter(self.liste)
+
+    def __contains__(self, id_produit):
+        return id_produit in self._produits
+
+    def get_produit(self, id_produit):
+        """Retourne le produit d'id `id_produit`, ou None s'il est absent."""
+        return self._produits.get(id_produit)
+
+    def vue_triee(self, nom, debut=0, fin=None):
+        """Produits d'indices [debut, fin[ dans l'ordre de la clé `nom`, en O(k)."""
+        return [self._produits[e[2]] for e in self._vue(nom)[debut:fin]]
+
+    def tranche(self, debut=0, fin=None):
+        """Produits d'indices [debut, fin[ dans l'ordre courant, sans copier toute la liste."""
+        if self._ordre is None:
+            return list(islice(self._produits.values(), debut, fin))
+        return self.vue_triee(self._ordre, debut, fin)
 
     @abstractmethod
     def ajouter_produit(self, produit):
@@ -166,94 +296,226 @@ class Inventaire(ABC):
     def delete_produit(self, id_produit):
         pass
 
+    def ajouter_produits(self, produits):
+        """Ajoute une série de produits (chargement en masse)."""
+        if self.stockage is None:
+            for p in produits:
+                self.ajouter_produit(p)
+            return
+        with self._lot_stockage():
+            for p in produits:
+                self.ajouter_produit(p)
+
     # ================= AJOUT : méthodes de tri =================
 
+    def trier_par(self, nom):
+        """
+        Présente l'inventaire selon la clé `nom` (voir CLES_TRI).
+        La vue triée est réutilisée : changer d'ordre ne retrie rien.
+        """
+        if nom not in self.CLES_TRI:
+            raise ValueError(f"Clé de tri inconnue : {nom}")
+        self._vue(nom)
+        self._ordre = nom
+
     def trier_par_nom(self):
         """
         Trie l'inventaire par ordre alphabétique du nom du produit.
         """
-        self.liste = merge_sort(self.liste, key=lambda p: str(p.nom).lower())
+        self.trier_par("nom")
 
     def trier_par_prix(self):
         """
         Trie l'inventaire par ordre croissant du prix.
         """
-        self.liste = merge_sort(self.liste, key=lambda p: float(p.prix))
+        self.trier_par("prix")
 
 
 class Inventaire_Produits(Inventaire) : 
+    """
+    Grille des widgets Produit_Fenetre affichés dans la boutique, indexés par
+    l'id du produit qu'ils représentent. Seules les lignes visibles ont des
+    widgets : en faisant défiler, les mêmes widgets sont réutilisés pour les
+    produits suivants. Ouvrir une catégorie de 10 000 produits coûte donc
+    autant qu'en ouvrir une de 12.
+    """
+    X0, Y0 = 50, 100            # position du premier widget
+    PAS_X, PAS_Y = 160, 260
+    LARGEUR, HAUTEUR = 150, 225
+    COLONNES = 4
+    LIGNES_VISIBLES = 2
+
     def __init__(self, panier):
         super().__init__()
         self.current_liste  = 0
         self.panier = panier
+        self.premiere_ligne = 0
+        self._widgets = []      # widgets réutilisables, dans l'ordre des emplacements
+
+    def _id(self, widget):
+        return widget.parent.id
 
     def ajouter_produit(self, produit):
-        self.liste.append(Produit_Fenetre(produit, 0,0,0,0, (220,220,220), self.panier))
+        self._indexer(Produit_Fenetre(produit, 0,0,0,0, (220,220,220), self.panier))
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
     def importer_liste(self, inventaire, force = False) : 
         if self.current_liste != inventaire or force: 
             self.current_liste = inventaire
-            self.liste = []
-            x, y = 50,100
-            for p in inventaire.liste : 
-                self.liste.append(Produit_Fenetre(p,x ,y ,150 , 225, (220,220,220), self.panier))
-                x += 160
-                if x > 600 : 
-                    x = 50
-                    y+=260
+            self.premiere_ligne = 0
+            self._disposer()
+
+    @property
+    def nombre_lignes(self):
+        if self.current_liste == 0:
+            return 0
+        return -(-len(self.current_liste) // self.COLONNES)
+
+    def _disposer(self):
+        """
+        Affecte les produits visibles de l'inventaire courant aux widgets, dans
+        l'ordre courant, et les place en grille.
+        """
+        par_page = self.COLONNES * self.LIGNES_VISIBLES
+        debut = self.premiere_ligne * self.COLONNES
+        produits = self.current_liste.tranche(debut, debut + par_page)
+        # Un produit déjà affiché garde son widget ; les autres widgets sont réaffectés
+        affiches = {id(w.parent): w for w in self._widgets}
+        visibles = {id(p) for p in produits}
+        libres = [w for w in self._widgets if id(w.parent) not in visibles]
+        widgets = []
+        for i, p in enumerate(produits):
+            w = affiches.get(id(p))
+            if w is None:
+                if libres:
+                    w = libres.pop()
+                    w.changer_produit(p)
+                else:
+                    w = Produit_Fenetre(p, 0, 0, self.LARGEUR, self.HAUTEUR, (220,220,220), self.panier)
+            w.x = self.X0 + (i % self.COLONNES) * self.PAS_X
+            w.y = self.Y0 + (i // self.COLONNES) * self.PAS_Y
+            widgets.append(w)
+        self._widgets = widgets + libres
+        self.liste = widgets
+        # Page suivante chargée d'avance
+        self.precharger(self.current_liste, self.premiere_ligne + self.LIGNES_VISIBLES)
+
+    def precharger(self, inventaire, premiere_ligne=0):
+        """
+        Lance en arrière-plan le chargement des images d'une page de `inventaire`
+        (par défaut la première) pour qu'elle s'affiche sans attente.
+        """
+        par_page = self.COLONNES * self.LIGNES_VISIBLES
+        debut = premiere_ligne * self.COLONNES
+        taille = (self.LARGEUR-40, self.HAUTEUR-140)
+        cache_images.precharger((p.image_path, taille)
+                                for p in inventaire.tranche(debut, debut + par_page))
+
+    def defiler(self, lignes):
+        """Fait défiler la grille de `lignes` lignes (négatif : vers le haut)."""
+        maximum = max(0, self.nombre_lignes - self.LIGNES_VISIBLES)
+        premiere_ligne = min(max(0, self.premiere_ligne + lignes), maximum)
+        if premiere_ligne != self.premiere_ligne:
+            self.premiere_ligne = premiere_ligne
+            self._disposer()
+
+    def page_suivante(self):
+        self.defiler(self.LIGNES_VISIBLES)
+
+    def page_precedente(self):
+        self.defiler(-self.LIGNES_VISIBLES)
+
+    def _reordonner(self):
+        """
+        Après un tri : revient en haut de la grille ; les widgets déjà affichés
+        sont réutilisés (pas de rechargement d'image pour un produit toujours visible).
+        """
+        self.premiere_ligne = 0
+        self._disposer()
 
     def trier_par_nom_spe(self):
         """
         Trie l'inventaire par ordre alphabétique du nom du produit.
         """
         self.current_liste.trier_par_nom()
-        self.importer_liste(self.current_liste, force = True)
+        self._reordonner()
         
     def trier_par_prix_spe(self):
         """
         Trie l'inventaire par ordre croissant du prix.
         """
         self.current_liste.trier_par_prix()
-        self.importer_liste(self.current_liste, force = True)
+        self._reordonner()
 
 class Inventaire_Panier(Inventaire) : 
+    """
+    Un même produit peut être pris plusieurs fois : on garde une quantité par id.
+    Le total est tenu à jour en centimes entiers (pas de dérive des float).
+    """
     def __init__(self):
         super().__init__()
-        self.prix_tot = 0
+        self._quantites = {}
+        self._nombre = 0
+        self.total_centimes = 0
+
+    @property
+    def prix_tot(self):
+        return self.total_centimes / 100
+
+    @property
+    def liste(self):
+        return [p for p in Inventaire.liste.fget(self)
+                for _ in range(self._quantites[p.id])]
+
+    @liste.setter
+    def liste(self, produits):
+        Inventaire.liste.fset(self, [])
+        self._quantites = {}
+        self._nombre = 0
+        self.total_centimes = 0
+        for p in produits:
+            self.ajouter_produit(p)
+
+    def __len__(self):
+        return self._nombre
+
+    def get_quantite(self, id_produit):
+        return self._quantites.get(id_produit, 0)
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
-        self.prix_tot += produit.prix
+        if produit.id not in self._produits:
+            self._indexer(produit)
+        self._quantites[produit.id] = self._quantites.get(produit.id, 0) + 1
+        self._nombre += 1
+        self.total_centimes += en_centimes(produit.prix)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                self.prix_tot -= p.prix
-                return True
-        return False
+        """Retire un exemplaire du produit."""
+        p = self._produits.get(id_produit)
+        if p is None:
+            return False
+        self._quantites[id_produit] -= 1
+        if self._quantites[id_produit] == 0:
+            del self._quantites[id_produit]
+            self._desindexer(id_produit)
+        self._nombre -= 1
+        self.total_centimes -= en_centimes(p.prix)
+        return True
 
 
 class Inventaire_boisson(Inventaire):
+    CLES_TRI = dict(Inventaire.CLES_TRI, volume=lambda p: float(p.volume))
+
     def __init__(self):
         super().__init__()
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
 
 class Inventaire_food(Inventaire):
@@ -261,14 +523,10 @@ class Inventaire_food(Inventaire):
         super().__init__()
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
 
 class Inventaire_vetement(Inventaire):
@@ -276,44 +534,38 @@ class Inventaire_vetement(Inventaire):
         super().__init__()
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
 
 class Inventaire_tech(Inventaire):
+    CLES_TRI = dict(Inventaire.CLES_TRI, garantie=lambda p: int(p.garantie))
+
     def __init__(self):
         super().__init__()
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
 
 class Inventaire_developpeur(Inventaire):
+    NIVEAUX = {"Junior": 0, "Intermédiaire": 1, "Senior": 2, "Expert": 3}
+    CLES_TRI = dict(Inventaire.CLES_TRI,
+                    niveau=lambda p: Inventaire_developpeur.NIVEAUX.get(p.niveau, len(Inventaire_developpeur.NIVEAUX)))
+
     def __init__(self):
         super().__init__()
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
 
 class Inventaire_ticket(Inventaire):
@@ -321,57 +573,89 @@ class Inventaire_ticket(Inventaire):
         super().__init__()
 
     def ajouter_produit(self, produit):
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def delete_produit(self, id_produit):
-        for p in self.liste:
-            if p.id == id_produit:
-                self.liste.remove(p)
-                return True
-        return False
+        return self._desindexer(id_produit)
 
 
 class Inventaire_totale(Inventaire):
+    """
+    Vue vivante sur plusieurs inventaires : rien n'est copié, un produit
+    ajouté ou supprimé dans un inventaire source est immédiatement visible ici.
+    Une fois triée, la vue fusionne les vues triées des sources (heapq.merge).
+    """
     def __init__(self):
-        super().__init__()
+        super().__init__()  # self._produits : produits ajoutés directement à la vue
         self.inventaires = []  # on garde une référence vers tous les inventaires sources
 
+    @property
+    def liste(self):
+        sources = self.inventaires + [self]
+        if self._ordre is None:
+            return [p for inv in sources for p in inv._produits.values()]
+        vues = [self._parcourir_vue(inv, self._ordre) for inv in sources]
+        return [e[3] for e in heapq.merge(*vues)]
+
+    @staticmethod
+    def _parcourir_vue(inv, nom):
+        produits = inv._produits
+        for cle, rang, i in inv._vue(nom):
+            yield cle, rang, i, produits[i]
+
+    def __len__(self):
+        return sum(len(inv) for inv in self.inventaires) + len(self._produits)
+
+    def __contains__(self, id_produit):
+        return self.get_produit(id_produit) is not None
+
+    def get_produit(self, id_produit):
+        for inv in self.inventaires:
+            p = inv.get_produit(id_produit)
+            if p is not None:
+                return p
+        return self._produits.get(id_produit)
+
+    def tranche(self, debut=0, fin=None):
+        return self.liste[debut:fin]
+
+    def vue_triee(self, nom, debut=0, fin=None):
+        ordre, self._ordre = self._ordre, nom
+        try:
+            return self.liste[debut:fin]
+        finally:
+            self._ordre = ordre
+
+    def trier_par(self, nom):
+        # Seules les clés communes à tous les inventaires ont un sens sur la vue totale
+        if nom not in Inventaire.CLES_TRI:
+            raise ValueError(f"Clé de tri inconnue : {nom}")
+        self._ordre = nom
+
     def ajouter_produit(self, produit):
         """
         Implémentation minimale pour respecter l'interface Inventaire.
         Ici, on peut ajouter un produit directement dans l'inventaire total.
         """
-        self.liste.append(produit)
+        self._indexer(produit)
 
     def construire_depuis_inventaires(self, *inventaires):
         """
-        Construit l'inventaire total en concaténant les listes
-        de tous les inventaires passés en argument.
+        Branche la vue sur les inventaires passés en argument
+        (aucune copie des produits).
         """
         self.inventaires = list(inventaires)
-        self.liste = []
-        for inv in inventaires:
-            self.liste.extend(inv.liste)
 
     def delete_produit(self, id_produit):
         """
-        Supprime le produit d'id `id_produit` :
-        - dans tous les inventaires sources
-        - et dans l'inventaire total
+        Supprime le produit d'id `id_produit` dans tous les inventaires
+        sources (et parmi les produits ajoutés directement).
         Retourne True si au moins un produit a été supprimé, False sinon.
         """
-        supprime = False
-
-        # 1) supprimer dans les inventaires d'origine
+        supprime = self._desindexer(id_produit)
         for inv in self.inventaires:
-            if isinstance(inv, Inventaire):  # par sécurité
-                if inv.delete_produit(id_produit):
-                    supprime = True
-
-        # 2) mettre à jour la liste totale
-        if supprime:
-            self.liste = [p for p in self.liste if p.id != id_produit]
-
+            if inv.delete_produit(id_produit):
+                supprime = True
         return supprime
 
 
@@ -380,11 +664,41 @@ class Inventaire_totale(Inventaire):
 # ============================
 
 class Order:
-    def __init__(self, statut, user, produits):
+    # DiffuseurNotifications commun à toutes les commandes (None : notifications
+    # synchrones). Peut être remplacé commande par commande via le constructeur.
+    diffuseur = None
+
+    def __init__(self, statut, user, produits, diffuseur=None):
         self.statut = statut
         self.user = user
         self.produits = produits
         self.observers = []
+        if diffuseur is not None:
+            self.diffuseur = diffuseur
+
+    @property
+    def montant_centimes(self):
+        """
+        Montant de la commande en centimes : lu directement sur un Inventaire_Panier
+        (total tenu à jour à chaque ajout / retrait), sinon recalculé à chaque
+        appel, la liste de produits pouvant changer.
+        """
+        if isinstance(self.produits, Inventaire_Panier):
+            return self.produits.total_centimes
+        return sum(en_centimes(p.prix) for p in self.produits)
+
+    @property
+    def montant(self):
+        return self.montant_centimes / 100
+
+    def quantites(self):
+        """Quantité commandée par id de produit."""
+        if isinstance(self.produits, Inventaire_Panier):
+            return dict(self.produits._quantites)
+        quantites = {}
+        for p in self.produits:
+            quantites[p.id] = quantites.get(p.id, 0) + 1
+        return quantites
 
     def add_observer(self, observer):
         self.observers.append(observer)
@@ -393,30 +707,197 @@ class Order:
         self.observers.remove(observer)
 
     def notify_observers(self, payment_info):
+        if self.diffuseur is not None:
+            self.diffuseur.soumettre(tuple(self.observers), payment_info)
+            return
         for observer in self.observers:
             observer.update(payment_info)
 
-    def set_statut(self, new_statut):
+    def set_statut(self, new_statut, notifier=True):
+        """
+        Change le statut et prévient les observers. Avec notifier=False, les
+        observers ne sont pas appelés : le payment_info est seulement retourné
+        (utilisé par PaymentStrategy.payer_lot qui les notifie par lots).
+        """
         self.statut = new_statut
         payment_info = {
             "user": self.user,
-            "amount": sum(p.prix for p in self.produits),
+            "amount": self.montant,
             "statut": new_statut
         }
-        self.notify_observers(payment_info)
+        if notifier:
+            self.notify_observers(payment_info)
+        return payment_info
 
 
 class Observer:
     def update(self, payment_info):
         raise NotImplementedError
 
+    def update_lot(self, payment_infos):
+        """Plusieurs notifications d'un coup ; par défaut, update() sur chacune."""
+        for payment_info in payment_infos:
+            self.update(payment_info)
+
+
+class DiffuseurNotifications:
+    """
+    Livre les notifications des commandes depuis un thread dédié, pour que
+    set_statut (et donc le paiement, l'interface) n'attende pas les observers.
+    - file bornée : si elle est pleine, soumettre() attend qu'une place se
+      libère (les producteurs ralentissent au lieu d'accumuler sans limite)
+    - un seul thread de livraison : les notifications arrivent à chaque
+      observer dans l'ordre où elles ont été soumises
+    - une exception dans un observer est affichée et comptée, sans arrêter
+      la livraison aux autres observers ni des notifications suivantes
+    Les notifications en attente sont livrées à la fin du programme.
+    """
+    _FIN = object()
+
+    def __init__(self, taille_max=1000):
+        self._file = queue.Queue(maxsize=taille_max)
+        self._thread = None
+        self._verrou = threading.Lock()
+        self.erreurs = 0
+
+    def _demarrer(self):
+        with self._verrou:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._boucle, name="notifications",
+                                                daemon=True)
+                self._thread.start()
+                atexit.register(self.arreter)
+
+    def soumettre(self, observers, payment_info, lot=False):
+        """
+        Met en file une notification pour `observers`. Avec lot=True,
+        payment_info est une liste livrée en un appel à update_lot().
+        """
+        if self._thread is None:
+            self._demarrer()
+        self._file.put((observers, payment_info, lot))
+
+    def _boucle(self):
+        while True:
+            element = self._file.get()
+            try:
+                if element is self._FIN:
+                    return
+                observers, payment_info, lot = element
+                for observer in observers:
+                    try:
+                        if lot:
+                            observer.update_lot(payment_info)
+                        else:
+                            observer.update(payment_info)
+                    except Exception as erreur:
+                        self.erreurs += 1
+                        print(f"[ERREUR] {type(observer).__name__} : {erreur!r}", file=sys.stderr)
+            finally:
+                self._file.task_done()
+
+    def attendre(self):
+        """Attend que toutes les notifications soumises aient été livrées."""
+        if self._thread is not None:
+            self._file.join()
+
+    def arreter(self):
+        """Livre les notifications en attente puis arrête le thread."""
+        with self._verrou:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._file.put(self._FIN)
+            thread.join()
+
 
 class MessageObserver(Observer):
+    @staticmethod
+    def _message(payment_info):
+        return (f"[INFO] Notification envoyée :\n"
+                f" - Utilisateur : {payment_info['user']}\n"
+                f" - Montant : {payment_info['amount']}€\n"
+                f" - Statut : {payment_info['statut']}")
+
     def update(self, payment_info):
-        print(f"[INFO] Notification envoyée :")
-        print(f" - Utilisateur : {payment_info['user']}")
-        print(f" - Montant : {payment_info['amount']}€")
-        print(f" - Statut : {payment_info['statut']}")
+        print(self._message(payment_info))
+
+    def update_lot(self, payment_infos):
+        # Un seul print pour tout le lot au lieu de quatre par commande
+        print("\n".join(self._message(info) for info in payment_infos))
+
+
+# ============================
+#       PERSISTANCE CSV
+# ============================
+
+def _remplacer_atomiquement(filepath, ecrire):
+    """
+    Appelle ecrire(fichier) sur un fichier temporaire du même dossier, puis
+    remplace `filepath` par ce fichier (os.replace, atomique) : en cas d'erreur
+    ou d'arrêt en cours d'écriture, l'ancien fichier reste intact.
+    """
+    fd, temporaire = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filepath)),
+                                      suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as fichier:
+            resultat = ecrire(fichier)
+        if os.path.exists(filepath):
+            shutil.copymode(filepath, temporaire)
+        os.replace(temporaire, filepath)
+        return resultat
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+
+
+def supprimer_lignes_csv(filepath, colonne, valeur):
+    """
+    Supprime du CSV les lignes dont `colonne` vaut `valeur`.
+    Les lignes sont recopiées une à une (mémoire bornée) vers un fichier
+    temporaire qui remplace l'original ; l'en-tête du fichier est conservé.
+    Retourne le nombre de lignes supprimées.
+    """
+    valeur = str(valeur)
+
+    def recopier(cible):
+        supprimees = 0
+        with open(filepath, 'r', newline='') as source:
+            reader = csv.reader(source, delimiter=';')
+            writer = csv.writer(cible, delimiter=';')
+            entete = next(reader, None)
+            if entete is None:
+                return 0
+            writer.writerow(entete)
+            index = entete.index(colonne)
+            for row in reader:
+                if row[index] == valeur:
+                    supprimees += 1
+                else:
+                    writer.writerow(row)
+        return supprimees
+
+    return _remplacer_atomiquement(filepath, recopier)
+
+
+def ecrire_csv(filepath, fieldnames, lignes):
+    """
+    Réécrit entièrement le CSV à partir de l'itérable de dicts `lignes`,
+    en flux et de façon atomique.
+    """
+    def ecrire(cible):
+        writer = csv.DictWriter(cible, fieldnames=fieldnames, delimiter=';')
+        writer.writeheader()
+        writer.writerows(lignes)
+
+    _remplacer_atomiquement(filepath, ecrire)
+
+
+def ajouter_lignes_csv(filepath, fieldnames, lignes):
+    """Ajoute les dicts `lignes` à la fin du CSV (sans relire le fichier)."""
+    with open(filepath, 'a', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=';')
+        writer.writerows(lignes)
 
 
 # ============================
@@ -438,8 +919,10 @@ class user(ABC) :
         pass
 
 class Admin(user) :
-    def __init__(self, iduser, nom, prenom,filepath_client_csv,filepath_produit1_csv,filepath_produit2_csv,filepath_produit3_csv,filepath_produit4_csv,filepath_produit5_csv,filepath_produit6_csv) :
+    def __init__(self, iduser, nom, prenom,filepath_client_csv,filepath_produit1_csv,filepath_produit2_csv,filepath_produit3_csv,filepath_produit4_csv,filepath_produit5_csv,filepath_produit6_csv, stockage=None) :
         super().__init__(iduser, nom, prenom)
+        # Si un stockage (ex : StockageSQLite) est fourni, il remplace les fichiers CSV
+        self.stockage = stockage
         self.filepath_client_csv = filepath_client_csv
         self.filepath_produit1_csv = filepath_produit1_csv
         self.filepath_produit2_csv = filepath_produit2_csv
@@ -457,82 +940,115 @@ class Admin(user) :
                 return True
         return False
     def ajouter_produit_csv(self,produit,filepath) :
+        if self.stockage is not None:
+            self.stockage.ajouter_produits([produit])
+            self.stockage.valider()
+            return
         with open (filepath,'a',newline='') as csvfile :
             fieldnames = ['id','nom','prix','image_path']
             writer = csv.DictWriter(csvfile,fieldnames=fieldnames,delimiter=';')
             writer.writerow({'id':produit.id,'nom':produit.nom,'prix':produit.prix,'image_path':produit.image_path})
 
     def supprimer_produit_csv(self,idproduit,filepath) :
-        produits = []
-        with open(filepath, 'r', newline='') as csvfile :
-            reader = csv.DictReader(csvfile, delimiter=';')
-            for row in reader :
-                if int(row['id']) != idproduit :
-                    produits.append(row)
-        with open(filepath, 'w', newline='') as csvfile :
-            fieldnames = ['id','nom','prix','image_path']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=';')
-            writer.writeheader()
-            for produit in produits :
-                writer.writerow(produit)
+        if self.stockage is not None:
+            existe = self.stockage.contient_produit(idproduit)
+            self.stockage.supprimer_produit(idproduit)
+            self.stockage.valider()
+            return existe
+        return supprimer_lignes_csv(filepath, 'id', idproduit) > 0
 
     
 
 
     def supprimer_client_csv(self,idclient) :
-        clients = []
-        with open(self.filepath_client_csv, 'r', newline='') as csvfile :
-            reader = csv.DictReader(csvfile, delimiter=';')
-            for row in reader :
-                if int(row['iduser']) != idclient :
-                    clients.append(row)
-        with open(self.filepath_client_csv, 'w', newline='') as csvfile :
-            fieldnames = ['iduser', 'nom', 'prenom']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=';')
-            writer.writeheader()
-            for client in clients :
-                writer.writerow(client)
+        if self.stockage is not None:
+            supprime = self.stockage.supprimer_client(idclient)
+            self.stockage.valider()
+            return supprime
+        return supprimer_lignes_csv(self.filepath_client_csv, 'iduser', idclient) > 0
 
 class Client(user) :
-    def __init__(self, iduser, nom, prenom,order,monnaie,filepath_csv,payment_strategy=None) :
+    def __init__(self, iduser, nom, prenom,order,monnaie,filepath_csv,payment_strategy=None, stockage=None, registre=None) :
         super().__init__(iduser, nom, prenom)
+        # Si un stockage (ex : StockageSQLite) est fourni, il remplace les fichiers CSV
+        self.stockage = stockage
         self.order = order
         self.monnaie = monnaie
+        # Si un registre (registre.RegistreMemoire, stockage_sqlite.RegistreSQLite)
+        # est fourni, c'est lui qui tient le solde ; monnaie n'en est que le reflet
+        self.registre = registre
+        self._verrou = threading.Lock()
+        if registre is not None:
+            registre.ouvrir_compte(iduser, en_centimes(monnaie))
+            self.monnaie = registre.solde(iduser) / 100
         self.filepath_csv = filepath_csv
         self.payment_strategy = payment_strategy
+        # Suivi pour stockage_inventaire_csv : produits ajoutés depuis la
+        # dernière sauvegarde, ou réécriture complète nécessaire
+        self._a_sauvegarder = []
+        self._reecriture_complete = True
     def ajouter_produit_inventaire(self,produit) :
         self.inventaire.append(produit)
+        self._a_sauvegarder.append(produit)
 
     
     def supprimer_produit_inventaire(self,idproduit) :
         for p in self.inventaire :
             if p.id == idproduit :
                 self.inventaire.remove(p)
+                self._reecriture_complete = True
                 return True
         return False
 
     def supprimer_produit_csv(self,idproduit,filepath) :
-        produits = []
-        with open(filepath, 'r', newline='') as csvfile :
-            reader = csv.DictReader(csvfile, delimiter=';')
-            for row in reader :
-                if int(row['id']) != idproduit :
-                    produits.append(row)
-        with open(filepath, 'w', newline='') as csvfile :
-            fieldnames = ['id','nom','prix','image_path']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=';')
-            writer.writeheader()
-            for produit in produits :
-                writer.writerow(produit)
+        if self.stockage is not None:
+            supprime = self.stockage.supprimer_produit_inventaire_client(self.iduser, idproduit)
+            self.stockage.valider()
+            return supprime
+        return supprimer_lignes_csv(filepath, 'id', idproduit) > 0
 
     def stockage_inventaire_csv(self) :
-        with open (self.filepath_csv,'w',newline='') as csvfile :
-            fieldnames = ['id','nom','prix','image_path']
-            writer = csv.DictWriter(csvfile,fieldnames=fieldnames,delimiter=';')
-            writer.writeheader()
-            for p in self.inventaire :
-                writer.writerow({'id':p.id,'nom':p.nom,'prix':p.prix,'image_path':p.image_path})
-
+        """
+        Sauvegarde l'inventaire. Si seuls des produits ont été ajoutés depuis la
+        dernière sauvegarde, ils sont simplement ajoutés en fin de fichier ;
+        sinon (première sauvegarde, suppression) le fichier est réécrit en flux
+        et de façon atomique.
+        """
+        fieldnames = ['id','nom','prix','image_path']
+        def ligne(p):
+            return {'id':p.id,'nom':p.nom,'prix':p.prix,'image_path':p.image_path}
+        if self.stockage is not None:
+            if self._reecriture_complete:
+                self.stockage.remplacer_inventaire_client(self.iduser, self.inventaire)
+            else:
+                self.stockage.ajouter_inventaire_client(self.iduser, self._a_sauvegarder)
+            self.stockage.valider()
+        elif self._reecriture_complete or not os.path.exists(self.filepath_csv):
+            ecrire_csv(self.filepath_csv, fieldnames, (ligne(p) for p in self.inventaire))
+        elif self._a_sauvegarder:
+            ajouter_lignes_csv(self.filepath_csv, fieldnames, (ligne(p) for p in self._a_sauvegarder))
+        self._a_sauvegarder = []
+        self._reecriture_complete = False
+
+
+    def debiter(self, montant_centimes, quantites=None):
+        """
+        Vérifie et débite le solde d'un seul bloc (et les stocks de `quantites`,
+        dict id produit -> quantité, si un registre est utilisé), pour que deux
+        paiements simultanés ne puissent pas dépenser le même argent.
+        Retourne True si le paiement est passé.
+        """
+        if self.registre is not None:
+            if not self.registre.debiter(self.iduser, montant_centimes, quantites):
+                return False
+            self.monnaie = self.registre.solde(self.iduser) / 100
+            return True
+        with self._verrou:
+            monnaie = en_centimes(self.monnaie)
+            if monnaie < montant_centimes:
+                return False
+            self.monnaie = (monnaie - montant_centimes) / 100
+            return True
 
     def process_payment(self):
         if self.payment_strategy is None:
@@ -544,43 +1060,99 @@ class Client(user) :
 
 
 
+def livrer_notifications(notifications, taille_lot=500, diffuseur=None):
+    """
+    notifications : liste de (order, payment_info) dans l'ordre des paiements.
+    Chaque observer reçoit ses notifications par lots de `taille_lot` via
+    update_lot(), dans le même ordre, au lieu d'un appel par commande.
+    Avec un DiffuseurNotifications, les lots lui sont confiés et la fonction
+    retourne sans attendre les observers.
+    """
+    par_observer = {}
+    for order, payment_info in notifications:
+        for observer in order.observers:
+            par_observer.setdefault(id(observer), (observer, []))[1].append(payment_info)
+    for observer, infos in par_observer.values():
+        for debut in range(0, len(infos), taille_lot):
+            if diffuseur is not None:
+                diffuseur.soumettre((observer,), infos[debut:debut + taille_lot], lot=True)
+            else:
+                observer.update_lot(infos[debut:debut + taille_lot])
+
+
 class PaymentStrategy(ABC):
+    # Préfixe des messages et statuts posés sur la commande : chaque moyen de
+    # paiement les définit en attributs de classe (utilisés par payer et payer_lot)
+    @property
     @abstractmethod
-    def payer(self, client, order):
+    def prefixe(self):
+        pass
+
+    @property
+    @abstractmethod
+    def statut_paye(self):
+        pass
+
+    @property
+    @abstractmethod
+    def statut_echec(self):
         pass
 
-class PaypalStrategy(PaymentStrategy):
     def payer(self, client, order):
-        amount = sum(p.prix for p in order.produits)
-        if client.monnaie >= amount:
-            client.monnaie -= amount
-            order.set_statut("Payé via Paypal")
-            print(f"[PayPal] Paiement de {amount}€ effectué pour {client.nom}.")
+        montant = order.montant_centimes
+        if client.debiter(montant, order.quantites()):
+            order.set_statut(self.statut_paye)
+            print(f"{self.prefixe} Paiement de {montant / 100}€ effectué pour {client.nom}.")
         else:
-            order.set_statut("Échec paiement Paypal")
-            print(f"[PayPal] Paiement échoué pour {client.nom} : fonds insuffisants.")
+            order.set_statut(self.statut_echec)
+            print(f"{self.prefixe} Paiement échoué pour {client.nom} : fonds insuffisants.")
+
+    def payer_lot(self, paiements, taille_lot=500):
+        """
+        Encaisse en une fois une liste de (client, order), par exemple lors
+        d'une vente de tickets. Le résultat est le même qu'en appelant payer()
+        sur chaque paire dans l'ordre (une commande est refusée si le solde du
+        client, après ses commandes précédentes du lot, ne suffit pas), mais :
+        - les observers sont notifiés par lots (livrer_notifications), via
+          le diffuseur de chaque commande s'il est défini (celui passé au
+          constructeur, sinon Order.diffuseur)
+        - un seul message récapitulatif est affiché
+        Retourne (commandes payées, commandes refusées).
+        """
+        payees, refusees, notifications = [], [], []
+        for client, order in paiements:
+            if client.debiter(order.montant_centimes, order.quantites()):
+                payees.append(order)
+                statut = self.statut_paye
+            else:
+                refusees.append(order)
+                statut = self.statut_echec
+            notifications.append((order, order.set_statut(statut, notifier=False)))
+
+        # Une livraison par diffuseur, comme le ferait notify_observers commande par commande
+        par_diffuseur = {}
+        for order, payment_info in notifications:
+            par_diffuseur.setdefault(id(order.diffuseur), (order.diffuseur, []))[1].append(
+                (order, payment_info))
+        for diffuseur, groupe in par_diffuseur.values():
+            livrer_notifications(groupe, taille_lot, diffuseur)
+        print(f"{self.prefixe} {len(payees)} paiement(s) effectué(s), {len(refusees)} refusé(s).")
+        return payees, refusees
+
+class PaypalStrategy(PaymentStrategy):
+    prefixe = "[PayPal]"
+    statut_paye = "Payé via Paypal"
+    statut_echec = "Échec paiement Paypal"
 
 class CreditCardStrategy(PaymentStrategy):
-    def payer(self, client, order):
-        amount = sum(p.prix for p in order.produits)
-        if client.monnaie >= amount:
-            client.monnaie -= amount
-            order.set_statut("Payé via Carte Bancaire")
-            print(f"[CB] Paiement de {amount}€ effectué pour {client.nom}.")
-        else:
-            order.set_statut("Échec paiement CB")
-            print(f"[CB] Paiement échoué pour {client.nom} : fonds insuffisants.")
+    prefixe = "[CB]"
+    statut_paye = "Payé via Carte Bancaire"
+    statut_echec = "Échec paiement CB"
 
 class CryptoStrategy(PaymentStrategy):
-    def payer(self, client, order):
-        amount = sum(p.prix for p in order.produits)
-        if client.monnaie >= amount:
-            client.monnaie -= amount
-            order.set_statut("Payé via Crypto")
-            print(f"[Crypto] Paiement de {amount}€ effectué pour {client.nom}.")
-        else:
-            order.set_statut("Échec paiement Crypto")
-            print(f"[Crypto] Paiement échoué pour {client.nom} : fonds insuffisants.")
+    prefixe = "[Crypto]"
+    statut_paye = "Payé via Crypto"
+    statut_echec = "Échec paiement Crypto"
 
 
 
@@ -2,6 +2,200 @@ import pygame
 import sys
 from random import randint
 import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ============================
+#      CACHE DES IMAGES
+# ============================
+IMAGE_PAR_DEFAUT = './images/flappy_bird.png'
+# Événement posté quand une image a fini de se décoder en arrière-plan
+IMAGE_PRETE = pygame.event.custom_type()
+
+
+class CacheImages:
+    """
+    Images des produits déjà redimensionnées, partagées par tous les widgets.
+    Clé : (chemin, taille). Les entrées les moins récemment utilisées sont
+    retirées dès que la mémoire des surfaces dépasse `octets_max`.
+    Seules les variantes redimensionnées sont gardées : les originaux (jusqu'à
+    2000x2000) coûteraient chacun plus que toute la grille.
+    Les surfaces rendues sont partagées : ne pas dessiner dessus.
+
+    demander() / precharger() décodent et redimensionnent en arrière-plan
+    (threads) ; la conversion au format de l'écran et la mise en cache se
+    font dans le thread principal, au demander() suivant. Chaque image
+    décodée poste un événement IMAGE_PRETE pour réveiller la boucle.
+
+    Si l'atlas des miniatures a été construit (python atlas_images.py), les
+    images qui y figurent en sont tirées directement, sans décodage.
+    """
+
+    def __init__(self, octets_max=32 * 1024 * 1024, threads=2):
+        self.octets_max = octets_max
+        self.octets = 0
+        self._surfaces = OrderedDict()
+        self.succes = 0
+        self.echecs = 0
+        self.threads = threads
+        self._executeur = None
+        self._en_cours = {}     # clé -> Future du décodage en arrière-plan
+        self._attentes = {}     # taille -> surface d'attente
+        self.atlas = None       # atlas_images.Atlas, chargé au premier besoin
+        self._atlas_cherche = False
+
+    @staticmethod
+    def _cle(chemin, taille):
+        if not chemin or not os.path.exists(chemin):
+            chemin = IMAGE_PAR_DEFAUT
+        return (chemin, tuple(taille))
+
+    @staticmethod
+    def _decoder(chemin, taille):
+        return pygame.transform.scale(pygame.image.load(chemin), taille)
+
+    @staticmethod
+    def _signaler(futur):
+        # Réveille la boucle principale si elle attend un événement (Cadenceur)
+        try:
+            pygame.event.post(pygame.event.Event(IMAGE_PRETE))
+        except pygame.error:
+            pass    # pas de fenêtre (benchmarks, atlas)
+
+    def _obtenir(self, cle):
+        surface = self._surfaces.get(cle)
+        if surface is not None:
+            self._surfaces.move_to_end(cle)
+            self.succes += 1
+            return surface
+        if not self._atlas_cherche:
+            from atlas_images import charger_atlas
+            self.atlas = charger_atlas()
+            self._atlas_cherche = True
+        if self.atlas is not None:
+            # Sous-surface d'une feuille de l'atlas : ne coûte presque rien,
+            # donc pas comptée dans octets (la feuille reste chargée de toute façon)
+            surface = self.atlas.miniature(*cle)
+            if surface is not None:
+                self.succes += 1
+        return surface
+
+    def charger(self, chemin, taille):
+        """Image `chemin` (ou l'image par défaut si absente) à la taille (largeur, hauteur)."""
+        cle = self._cle(chemin, taille)
+        surface = self._obtenir(cle)
+        if surface is not None:
+            return surface
+        futur = self._en_cours.pop(cle, None)
+        self.echecs += 1
+        return self._ajouter(cle, futur.result() if futur is not None else self._decoder(*cle))
+
+    def demander(self, chemin, taille):
+        """
+        Comme charger(), sans jamais bloquer : retourne None si l'image n'est
+        pas encore prête, et lance son décodage en arrière-plan.
+        """
+        cle = self._cle(chemin, taille)
+        surface = self._obtenir(cle)
+        if surface is not None:
+            return surface
+        futur = self._en_cours.get(cle)
+        if futur is None:
+            if self._executeur is None:
+                self._executeur = ThreadPoolExecutor(self.threads, thread_name_prefix="images")
+            futur = self._en_cours[cle] = self._executeur.submit(self._decoder, *cle)
+            futur.add_done_callback(self._signaler)
+            return None
+        if not futur.done():
+            return None
+        del self._en_cours[cle]
+        self.echecs += 1
+        return self._ajouter(cle, futur.result())
+
+    def precharger(self, demandes):
+        """Lance en arrière-plan le chargement des (chemin, taille) pas encore en cache."""
+        for chemin, taille in demandes:
+            self.demander(chemin, taille)
+
+    def attente(self, taille):
+        """Surface grise affichée tant que l'image n'est pas prête."""
+        taille = tuple(taille)
+        surface = self._attentes.get(taille)
+        if surface is None:
+            surface = pygame.Surface(taille)
+            surface.fill((200, 200, 200))
+            self._attentes[taille] = surface
+        return surface
+
+    def _ajouter(self, cle, surface):
+        # Surface au format de l'écran : blit bien plus rapide (si l'écran existe déjà)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+        self._surfaces[cle] = surface
+        self.octets += self._taille(surface)
+        while self.octets > self.octets_max and len(self._surfaces) > 1:
+            _, ancienne = self._surfaces.popitem(last=False)
+            self.octets -= self._taille(ancienne)
+        return surface
+
+    @staticmethod
+    def _taille(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def vider(self):
+        self._surfaces.clear()
+        self.octets = 0
+
+
+# Cache commun à toute l'application
+cache_images = CacheImages()
+
+
+# ============================
+#      POLICES
+# ============================
+_polices = {}
+
+
+def police(taille, nom=None):
+    """
+    Police `nom` (None : police par défaut) à la taille donnée, chargée une
+    seule fois puis partagée par tous les widgets : SysFont cherche la police
+    dans le système et ouvre son fichier à chaque appel.
+    """
+    cle = (nom, taille)
+    font = _polices.get(cle)
+    if font is None:
+        font = _polices[cle] = pygame.font.SysFont(nom, taille)
+    return font
+
+
+# ============================
+#      RENDU DES TEXTES
+# ============================
+RENDUS_MAX = 512
+_rendus = OrderedDict()
+
+
+def rendre_texte(font, texte, couleur):
+    """
+    Surface du texte, rendue une seule fois pour une même police, un même
+    texte et une même couleur (les polices étant partagées, les "Acheter",
+    "Prix : 2.50 €"... de tous les widgets partagent la même surface).
+    Ne pas dessiner sur le résultat.
+    """
+    cle = (font, texte, tuple(couleur))
+    surface = _rendus.get(cle)
+    if surface is None:
+        surface = font.render(texte, True, couleur)
+        _rendus[cle] = surface
+        if len(_rendus) > RENDUS_MAX:
+            _rendus.popitem(last=False)
+    else:
+        _rendus.move_to_end(cle)
+    return surface
 
 
 # ============================
@@ -16,28 +210,73 @@ class Fenetre:
         self.couleur = couleur
         self.boutons = []
         self.textes  = []  # Liste des textes à afficher
+        self.version = 0   # voir marquer_sale / MoteurRendu
 
     def ajouter_bouton(self, bouton):
         self.boutons.append(bouton)
 
     def ajouter_texte(self, texte, x, y, couleur=(0, 0, 0), taille=30):
         """Ajouter un texte à la fenêtre (position relative à la fenêtre)"""
-        self.textes.append({
+        entree = {
             "texte": texte,
             "x": x,
             "y": y,
             "couleur": couleur,
             "taille": taille,
-            "font": pygame.font.SysFont(None, taille)
-        })
+            "font": police(taille),
+            "rendu": None,      # texte de la surface ci-dessous
+            "surface": None,
+        }
+        self._rendre(entree)
+        self.textes.append(entree)
+        return entree
+
+    @staticmethod
+    def _rendre(entree):
+        entree["surface"] = rendre_texte(entree["font"], entree["texte"], entree["couleur"])
+        entree["rendu"] = entree["texte"]
+
+    def modifier_texte(self, entree, texte):
+        """Changer le contenu d'un texte renvoyé par ajouter_texte"""
+        entree["texte"] = texte
+
+    def tous_les_boutons(self):
+        """Boutons cliquables du widget (ceux de ses sous-fenêtres compris)."""
+        return self.boutons
+
+    def marquer_sale(self):
+        """
+        Signaler un changement que signature() ne voit pas (dessin propre à une
+        sous-classe) : le widget sera redessiné à la prochaine image.
+        """
+        self.version += 1
+
+    def rect(self):
+        """Zone de l'écran couverte par le widget, textes qui dépassent compris."""
+        zone = pygame.Rect(self.x, self.y, self.largeur, self.hauteur)
+        for t in self.textes:
+            if t["rendu"] != t["texte"]:
+                self._rendre(t)
+            zone.union_ip(t["surface"].get_rect(topleft=(self.x + t["x"], self.y + t["y"])))
+        return zone
+
+    def signature(self):
+        """
+        Tout ce qui détermine l'apparence du widget : deux signatures égales
+        donnent le même dessin, MoteurRendu ne le redessine donc pas.
+        """
+        return (self.x, self.y, self.largeur, self.hauteur, self.couleur, self.version,
+                tuple(t["texte"] for t in self.textes),
+                tuple((b.x, b.y, b.largeur, b.hauteur, b.couleur, b.texte) for b in self.boutons))
 
     def afficher(self, surface):
         # Dessiner le fond
         pygame.draw.rect(surface, self.couleur, (self.x, self.y, self.largeur, self.hauteur), border_radius = 10)
-        # Dessiner les textes
+        # Dessiner les textes (rendus une fois, puis seulement quand ils changent)
         for t in self.textes:
-            texte_surface = t["font"].render(t["texte"], True, t["couleur"])
-            surface.blit(texte_surface, (self.x + t["x"], self.y + t["y"]))
+            if t["rendu"] != t["texte"]:
+                self._rendre(t)
+            surface.blit(t["surface"], (self.x + t["x"], self.y + t["y"]))
         # Dessiner les boutons
         for bouton in self.boutons:
             bouton.afficher(surface)
@@ -61,7 +300,7 @@ class Bouton:
         self.action = action
         self.args = args
         self.kwargs = kwargs
-        self.font = pygame.font.SysFont(None, texte[1])
+        self.font = police(texte[1])
         fenetre.ajouter_bouton(self)
 
     def afficher(self, surface):
@@ -69,10 +308,15 @@ class Bouton:
         abs_y = self.fenetre.y + self.y
         pygame.draw.rect(surface, self.couleur, (abs_x, abs_y, self.largeur, self.hauteur), border_radius = 10)
         if self.texte:
-            texte_surface = self.font.render(self.texte, True, (0, 0, 0))
+            texte_surface = rendre_texte(self.font, self.texte, (0, 0, 0))
             texte_rect = texte_surface.get_rect(center=(abs_x + self.largeur / 2, abs_y + self.hauteur / 2))
             surface.blit(texte_surface, texte_rect)
 
+    def rect(self):
+        """Zone cliquable à l'écran, bords compris comme dans est_clique."""
+        return pygame.Rect(self.fenetre.x + self.x, self.fenetre.y + self.y,
+                           self.largeur + 1, self.hauteur + 1)
+
     def est_clique(self, souris_pos):
         abs_x = self.fenetre.x + self.x
         abs_y = self.fenetre.y + self.y
@@ -112,27 +356,48 @@ class PopUp(Fenetre):
 class Produit_Fenetre(Fenetre):
     def __init__(self, parent, x, y, largeur, hauteur, couleur, panier):
         super().__init__(x, y, largeur, hauteur, couleur)
-        self.parent  =parent
-        self.prix = parent.prix
-        self.nom = parent.nom
-        self.ajouter_texte(self.nom, 10, 10, couleur=(0,0,0), taille=25)
         self.panier = panier
-        # Charger l'image
-        
-        if os.path.exists(parent.image_path):
-            self.image = pygame.image.load(parent.image_path)
-        else : 
-            self.image = pygame.image.load('./images/flappy_bird.png')
-
-        self.image = pygame.transform.scale(self.image, (largeur-40, hauteur-140))  # redimensionner pour s'adapter
-        # Ajouter le prix
-        self.ajouter_texte(f"Prix : {format(self.prix, '.2f')} €", 20, hauteur-80, couleur=(0,0,0), taille=25)
+        self._texte_nom = self.ajouter_texte("", 10, 10, couleur=(0,0,0), taille=25)
+        self._texte_prix = self.ajouter_texte("", 20, hauteur-80, couleur=(0,0,0), taille=25)
+        self.parent = None
+        self.changer_produit(parent)
         # Bouton acheter
         bouton_acheter = Bouton(self, largeur//2 - 50, hauteur-50, 100, 40, (100,255,100), ("Acheter",30), action=self.acheter_produit, args= (panier,))
-        
+
+    def changer_produit(self, parent):
+        """
+        Affiche `parent` dans ce widget (réutilisé par la grille de la boutique
+        au lieu d'en créer un nouveau). Rien n'est rechargé si c'est le même produit.
+        """
+        if parent is self.parent:
+            return
+        self.parent = parent
+        self.prix = parent.prix
+        self.nom = parent.nom
+        self.modifier_texte(self._texte_nom, self.nom)
+        self.modifier_texte(self._texte_prix, f"Prix : {format(self.prix, '.2f')} €")
+        # Image redimensionnée pour s'adapter, chargée en arrière-plan une seule
+        # fois pour tous les widgets ; une surface grise en attendant
+        self.taille_image = (self.largeur-40, self.hauteur-140)
+        self.image = cache_images.demander(parent.image_path, self.taille_image)
+        self._image_prete = self.image is not None
+        if not self._image_prete:
+            self.image = cache_images.attente(self.taille_image)
+
+    def _rafraichir_image(self):
+        """Remplace la surface d'attente dès que l'image est chargée."""
+        if not self._image_prete:
+            image = cache_images.demander(self.parent.image_path, self.taille_image)
+            if image is not None:
+                self.image, self._image_prete = image, True
+
+    def signature(self):
+        self._rafraichir_image()
+        return super().signature() + (id(self.image),)
 
     def afficher(self, surface):
         super().afficher(surface)
+        self._rafraichir_image()
         # Afficher l'image
         surface.blit(self.image, (self.x + 20, self.y + 30))
     
@@ -149,20 +414,22 @@ class ProduitPanier(Fenetre):
         
         super().__init__(x, y, largeur, hauteur, couleur)
         
+        self.parent = parent
         self.nom = parent.nom
         self.prix = parent.prix
+        self.quantite = 1
+        self.emplacement = 0   # rang de la ligne dans le panier
 
         #self.ajouter_texte(self.nom, 10, 10, couleur=(0,0,0), taille=25)
         self.ajouter_texte(f"Prix : {format(self.prix, '.2f')} €", 10, hauteur-70,couleur=(0,0,0), taille=22)
         self.ajouter_texte(self.nom, 10, 10, couleur=(0,0,0), taille=25)
+        self._texte_quantite = self.ajouter_texte("x1", largeur - 40, hauteur - 70, couleur=(0,0,0), taille=22)
 
-        if os.path.exists(parent.image_path):
-            self.image = pygame.image.load(parent.image_path)
-        else : 
-            self.image = pygame.image.load('./images/flappy_bird.png')
-       
-        self.image = pygame.transform.scale(self.image,
-                                            (largeur - 20, hauteur - 120))
+        self.taille_image = (largeur - 20, hauteur - 120)
+        self.image = cache_images.demander(parent.image_path, self.taille_image)
+        self._image_prete = self.image is not None
+        if not self._image_prete:
+            self.image = cache_images.attente(self.taille_image)
 
         bouton_supprimer = Bouton(
             self,
@@ -176,86 +443,381 @@ class ProduitPanier(Fenetre):
         )
 
 
+    def changer_quantite(self, delta):
+        self.quantite += delta
+        self.modifier_texte(self._texte_quantite, f"x{self.quantite}")
+
+    def _rafraichir_image(self):
+        if not self._image_prete:
+            image = cache_images.demander(self.parent.image_path, self.taille_image)
+            if image is not None:
+                self.image, self._image_prete = image, True
+
+    def signature(self):
+        self._rafraichir_image()
+        return super().signature() + (id(self.image),)
+
     def afficher(self, surface):
         super().afficher(surface)
+        self._rafraichir_image()
         surface.blit(self.image, (self.x + 10, self.y + 40))
 
 
 class Panier_fenetre(Fenetre):
+    """
+    Panier affiché : une ligne (ProduitPanier) par produit avec sa quantité,
+    indexée par id. Le total est tenu à jour en centimes entiers à chaque
+    ajout / retrait, sans jamais re-sommer le panier.
+    """
+    HAUTEUR_LIGNE = 260
+
     def __init__(self, x, y, largeur, hauteur, couleur=(200,200,200), user  = 0):
         super().__init__(x, y, largeur, hauteur, couleur)
-        self.produits = []   # Liste des ProduitPanier
-        self.total = 0
+        self.lignes = {}         # id produit -> ProduitPanier
+        self._emplacements = []  # ProduitPanier, dans l'ordre d'affichage
+        self.total_centimes = 0
         self.user  = user
         Bouton(self,  largeur - 60, 10, 55,40, (255,100,100),("Payer",30), self.payer, args = (self.user,))
+        self._texte_total = self.ajouter_texte("", 20, 20, couleur=(0,0,0), taille=30)
+        self._maj_total()
 
-    def ajouter_produit(self, produit):
-        """
-        Ajoute un nouveau ProduitPanier dans le panier.
-        """
+    @property
+    def produits(self):
+        """Lignes du panier, dans l'ordre d'affichage."""
+        return self._emplacements
 
-        # Position verticale en fonction du nombre d'éléments
-        index = len(self.produits)
-        px = self.x + 10
-        py = self.y + 50 + index * 260   # espacement entre produits
+    @property
+    def total(self):
+        return self.total_centimes / 100
 
-        # Action de suppression
-        def supprimer_action(p=produit.nom):
-            self.supprimer_produit(p)
+    def _maj_total(self):
+        self.modifier_texte(self._texte_total, f"Total : {format(self.total, '.2f')} €")
 
-        # Créer le produit à afficher dans le panier
-        self.produits.append(ProduitPanier(produit, px, py,supprimer_action=lambda: self.supprimer_produit(produit.nom)))
-        self.mettre_a_jour_total()
+    def _position(self, emplacement):
+        return self.x + 10, self.y + 50 + emplacement * self.HAUTEUR_LIGNE
 
-    def supprimer_produit(self, nom_du_produit):
+    def ajouter_produit(self, produit):
+        """
+        Ajoute un exemplaire du produit : nouvelle ligne, ou quantité + 1.
+        """
+        ligne = self.lignes.get(produit.id)
+        if ligne is not None:
+            ligne.changer_quantite(+1)
+        else:
+            px, py = self._position(len(self._emplacements))
+            ligne = ProduitPanier(produit, px, py,
+                                  supprimer_action=lambda: self.supprimer_produit(produit.id))
+            ligne.emplacement = len(self._emplacements)
+            self.lignes[produit.id] = ligne
+            self._emplacements.append(ligne)
+        self.total_centimes += round(produit.prix * 100)
+        self._maj_total()
+
+    def supprimer_produit(self, id_produit):
         """
-        Supprime le premier produit correspondant au nom.
+        Retire un exemplaire du produit. Une ligne vidée est remplacée par la
+        dernière ligne du panier (aucune autre ligne ne bouge) : O(1).
         """
+        ligne = self.lignes.get(id_produit)
+        if ligne is None:
+            return False
+        self.total_centimes -= round(ligne.prix * 100)
+        self._maj_total()
+        if ligne.quantite > 1:
+            ligne.changer_quantite(-1)
+            return True
 
-        for p in self.produits:
-            if p.nom == nom_du_produit:
-                self.produits.remove(p)
-                break
+        del self.lignes[id_produit]
+        derniere = self._emplacements.pop()
+        if derniere is not ligne:
+            derniere.emplacement = ligne.emplacement
+            derniere.x, derniere.y = self._position(ligne.emplacement)
+            self._emplacements[ligne.emplacement] = derniere
+        return True
 
-        self.reorganiser_positions()
-        self.mettre_a_jour_total()
+    def vider(self):
+        self.lignes = {}
+        self._emplacements = []
+        self.total_centimes = 0
+        self._maj_total()
 
-    def reorganiser_positions(self):
-        """
-        Replace les produits proprement après une suppression.
-        """
+    def rect(self):
+        zone = super().rect()
+        for p in self._emplacements:
+            zone.union_ip(p.rect())
+        return zone
 
-        for i, p in enumerate(self.produits):
-            p.x = self.x + 10
-            p.y = self.y + 10 + i * 260
+    def signature(self):
+        return super().signature() + tuple(p.signature() for p in self._emplacements)
 
-    def mettre_a_jour_total(self):
-        self.total = sum(p.prix for p in self.produits)
+    def tous_les_boutons(self):
+        return [*self.boutons, *(b for p in self._emplacements for b in p.boutons)]
 
     def afficher(self, surface):
         super().afficher(surface)
 
         # Afficher les produits du panier
-        for p in self.produits:
+        for p in self._emplacements:
             p.afficher(surface)
 
-        # Afficher le total du panier
-        font = pygame.font.SysFont(None, 30)
-        surface.blit(
-            font.render(f"Total : {format(self.total, '.2f')} €", True, (0,0,0)),
-            (self.x + 20, self.y +20 )
-        )
     def payer(self, user) : 
-        if user.monnaie > self.total : 
-            user.monnaie -= self.total
-            self.produits = []
-            self.total = 0
+        # Vérification et débit d'un seul bloc (voir Client.debiter)
+        quantites = {id_produit: ligne.quantite for id_produit, ligne in self.lignes.items()}
+        if user.debiter(self.total_centimes, quantites) : 
+            self.vider()
             
         else : 
             print("pas assez d'argent")
         print(user.monnaie)
 
-    
+
+# ============================
+#    MOTEUR DE RENDU
+# ============================
+class MoteurRendu:
+    """
+    Rendu par rectangles sales : garde pour chaque widget de la scène la zone
+    et la signature() de sa dernière image, et ne redessine que les zones des
+    widgets qui ont changé, apparu ou disparu (ancienne et nouvelle position).
+    Dans chaque zone, le fond puis tous les widgets qui la touchent sont
+    redessinés dans l'ordre de la scène, et seules ces zones sont envoyées à
+    l'écran (pygame.display.update). Une image sans changement ne dessine rien.
+
+    Usage, à chaque tour de boucle :
+        moteur.dessiner([fenetre, *grille.liste, panier, *popups])
+    """
+    # Au-delà de cette part de l'écran, tout redessiner coûte moins cher
+    PART_PLEIN_ECRAN = 0.5
+
+    def __init__(self, ecran, fond=(255, 255, 255)):
+        self.ecran = ecran
+        self.fond = fond
+        self._etats = {}     # id(widget) -> (widget, rect, signature)
+        self._ordre = []     # id des widgets de la dernière image, dans l'ordre
+        self._tout = True
+        self.images = 0
+        self.images_vides = 0
+
+    def invalider(self):
+        """Tout redessiner à la prochaine image (écran recréé, fond changé...)."""
+        self._tout = True
+
+    def _zones(self, etats):
+        ecran = self.ecran.get_rect()
+        if self._tout:
+            return [ecran]
+        # Ordre relatif des widgets restés dans la scène changé : tout redessiner
+        restes = [cle for cle in self._ordre if cle in etats]
+        if restes != [cle for cle in etats if cle in self._etats]:
+            return [ecran]
+
+        sales = []
+        for cle, (widget, rect, signature) in etats.items():
+            ancien = self._etats.get(cle)
+            if ancien is None:
+                sales.append(rect)
+            elif ancien[2] != signature:
+                sales.append(ancien[1])
+                sales.append(rect)
+        for cle, (widget, rect, signature) in self._etats.items():
+            if cle not in etats:
+                sales.append(rect)
+
+        # Regrouper les zones qui se chevauchent, limitées à l'écran
+        zones = []
+        for zone in sales:
+            zone = zone.clip(ecran)
+            if not zone.width or not zone.height:
+                continue
+            i = zone.collidelist(zones)
+            while i != -1:
+                zone.union_ip(zones.pop(i))
+                i = zone.collidelist(zones)
+            zones.append(zone)
+        if sum(z.width * z.height for z in zones) > self.PART_PLEIN_ECRAN * ecran.width * ecran.height:
+            return [ecran]
+        return zones
+
+    def dessiner(self, scene):
+        """Dessine la scène (widgets du fond vers l'avant). Retourne les zones mises à jour."""
+        etats = {id(w): (w, w.rect(), w.signature()) for w in scene}
+        zones = self._zones(etats)
+        self._etats = etats
+        self._ordre = list(etats)
+        self._tout = False
+        self.images += 1
+        if not zones:
+            self.images_vides += 1
+            return zones
+
+        for zone in zones:
+            self.ecran.set_clip(zone)
+            self.ecran.fill(self.fond, zone)
+            for widget, rect, _ in etats.values():
+                if rect.colliderect(zone):
+                    widget.afficher(self.ecran)
+        self.ecran.set_clip(None)
+        pygame.display.update(zones)
+        return zones
+
+    def signature(self, widget):
+        """Signature de `widget` calculée par le dernier dessiner() (voir IndexClics)."""
+        return self._etats[id(widget)][2]
+
+
+# ============================
+#    INDEX DES CLICS
+# ============================
+class IndexClics:
+    """
+    Index spatial des boutons de la scène : grille uniforme de cellules de
+    `taille_cellule` pixels, chaque cellule listant les widgets et boutons
+    qui la recouvrent. Un clic ne teste que les entrées de sa cellule, quel
+    que soit le nombre de widgets affichés.
+
+    synchroniser(scene) reçoit la scène dans l'ordre du dessin (comme
+    MoteurRendu) ; seuls les widgets nouveaux ou dont la signature() a changé
+    (déplacés, produit remplacé, ligne de panier ajoutée...) sont ré-indexés.
+    Le fond d'un widget cache les boutons des widgets dessinés avant lui.
+    """
+
+    def __init__(self, taille_cellule=64, limites=None):
+        self.taille_cellule = taille_cellule
+        self.limites = limites    # pygame.Rect : zones hors écran non indexées
+        self._cellules = {}       # (colonne, ligne) -> [(id widget, sous-rang, objet, rect)]
+        self._widgets = {}        # id widget -> (widget, signature, cellules occupées)
+        self._rangs = {}          # id widget -> rang dans la scène (plus grand : devant)
+
+    def _cellules_de(self, rect):
+        if self.limites is not None:
+            rect = rect.clip(self.limites)
+        if not rect.width or not rect.height:
+            return []
+        t = self.taille_cellule
+        return [(colonne, ligne)
+                for colonne in range(rect.left // t, (rect.right - 1) // t + 1)
+                for ligne in range(rect.top // t, (rect.bottom - 1) // t + 1)]
+
+    def _indexer(self, widget, signature):
+        cle = id(widget)
+        occupees = set()
+        entrees = [(0, widget, widget.rect())]
+        entrees += [(i, b, b.rect()) for i, b in enumerate(widget.tous_les_boutons(), 1)]
+        for sous_rang, objet, rect in entrees:
+            for cellule in self._cellules_de(rect):
+                self._cellules.setdefault(cellule, []).append((cle, sous_rang, objet, rect))
+                occupees.add(cellule)
+        self._widgets[cle] = (widget, signature, occupees)
+
+    def _retirer(self, cle):
+        _, _, occupees = self._widgets.pop(cle)
+        for cellule in occupees:
+            entrees = [e for e in self._cellules[cellule] if e[0] != cle]
+            if entrees:
+                self._cellules[cellule] = entrees
+            else:
+                del self._cellules[cellule]
+
+    def synchroniser(self, scene, signature=None):
+        """
+        Met l'index à jour avec la scène (widgets du fond vers l'avant).
+        `signature` : fonction widget -> signature déjà calculée, par exemple
+        MoteurRendu.signature juste après avoir dessiné la même scène.
+        """
+        signature_de = signature or (lambda widget: widget.signature())
+        rangs = {id(w): rang for rang, w in enumerate(scene)}
+        for cle in [cle for cle in self._widgets if cle not in rangs]:
+            self._retirer(cle)
+        for widget in scene:
+            signature = signature_de(widget)
+            ancien = self._widgets.get(id(widget))
+            if ancien is not None:
+                if ancien[1] == signature:
+                    continue
+                self._retirer(id(widget))
+            self._indexer(widget, signature)
+        self._rangs = rangs
+
+    def bouton(self, pos):
+        """Bouton au premier plan sous `pos`, ou None (rien, ou le fond d'un widget)."""
+        t = self.taille_cellule
+        devant, objet = None, None
+        for cle, sous_rang, candidat, rect in self._cellules.get((pos[0] // t, pos[1] // t), ()):
+            if rect.collidepoint(pos):
+                rang = (self._rangs[cle], sous_rang)
+                if devant is None or rang > devant:
+                    devant, objet = rang, candidat
+        return objet if isinstance(objet, Bouton) else None
+
+
+# ============================
+#    CADENCE DES IMAGES
+# ============================
+class Cadenceur:
+    """
+    Rythme de la boucle principale. evenements() est appelée en début de
+    chaque tour et retourne les événements à traiter :
+    - animation en cours (actif=True) : les événements déjà arrivés, sans
+      attendre, le tour étant limité à fps_max images par seconde
+    - sinon (repos) : bloque sur pygame.event.wait jusqu'au prochain
+      événement (clic, molette, IMAGE_PRETE...), ou au plus attente_max_ms ;
+      une rafale d'événements reste limitée à fps_max
+
+    Le temps de travail de chaque tour (entre deux appels, attente exclue)
+    est gardé pour statistiques().
+    """
+
+    def __init__(self, fps_max=60, attente_max_ms=1000, historique=600):
+        self.fps_max = fps_max
+        self.attente_max_ms = attente_max_ms
+        self.horloge = pygame.time.Clock()
+        self._durees = deque(maxlen=historique)   # temps de travail des derniers tours (s)
+        self._debut_tour = None
+        self._lancement = time.perf_counter()
+        self.images = 0
+        self.images_repos = 0    # tours précédés d'une attente bloquante
+        self.temps_attente = 0.0
+
+    def evenements(self, actif=False):
+        """Événements du tour suivant (voir la classe)."""
+        debut_attente = time.perf_counter()
+        if self._debut_tour is not None:
+            self._durees.append(debut_attente - self._debut_tour)
+        evenements = []
+        if not actif:
+            premier = pygame.event.wait(self.attente_max_ms)
+            if premier.type != pygame.NOEVENT:
+                evenements.append(premier)
+            self.images_repos += 1
+        self.horloge.tick(self.fps_max)
+        evenements.extend(pygame.event.get())
+        self._debut_tour = time.perf_counter()
+        self.temps_attente += self._debut_tour - debut_attente
+        self.images += 1
+        return evenements
+
+    def statistiques(self):
+        """
+        Depuis la création : nombre de tours, tours au repos, images par
+        seconde, part du temps passée à attendre ; sur les derniers tours :
+        temps de travail moyen, 95e centile et maximum (ms).
+        """
+        duree = time.perf_counter() - self._lancement
+        durees = sorted(self._durees)
+        stats = {
+            "images": self.images,
+            "images_repos": self.images_repos,
+            "fps": self.images / duree if duree else 0.0,
+            "attente": self.temps_attente / duree if duree else 0.0,
+            "travail_moyen_ms": 0.0,
+            "travail_p95_ms": 0.0,
+            "travail_max_ms": 0.0,
+        }
+        if durees:
+            stats["travail_moyen_ms"] = sum(durees) / len(durees) * 1000
+            stats["travail_p95_ms"] = durees[int(0.95 * (len(durees) - 1))] * 1000
+            stats["travail_max_ms"] = durees[-1] * 1000
+        return stats
 
 
 def get_path (name) : 
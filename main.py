@@ -6,7 +6,6 @@ import os
 from random import randint
 
 import subprocess
-import os
 import time 
 import threading
 import random
@@ -51,14 +50,28 @@ def ouvrir_map() :
 
 popups = []
 TAILLE_ECRAN = (1000, 600)
+FPS_MAX = 60    # au repos, la boucle attend le prochain événement
 
 
 def get_path (name) : 
     return os.path.join(os.path.dirname(__file__), name)
 
+# Catégories proposées par les boutons de la boutique
+CATEGORIES_BOUTIQUE = ("boisson", "ticket", "tech", "developpeur")
+
 def ouvrir_boutique():
     global fenetre_actuelle
     fenetre_actuelle = "boutique"
+    # Le catalogue n'est lu qu'à la première ouverture de la boutique
+    if produits_fenetre.current_liste == 0:
+        ouvrir_categorie("boisson")
+        # Les images des premières pages des autres catégories se chargent
+        # en arrière-plan, pendant que l'utilisateur regarde les boissons
+        for categorie in CATEGORIES_BOUTIQUE:
+            produits_fenetre.precharger(catalogue.inventaire(categorie))
+
+def ouvrir_categorie(categorie):
+    produits_fenetre.importer_liste(catalogue.inventaire(categorie))
 
 def ouvrir_menu():
     global fenetre_actuelle
@@ -77,7 +90,7 @@ import classes_frontend
 from classes_frontend import *
 import boutique
 from boutique import *
-from map_finale import *
+# map_finale (et folium) n'est pas importé : la carte tourne dans un processus à part (ouvrir_map)
 
 
 # --- Defnition des actions des boutons ---
@@ -100,6 +113,19 @@ pygame.init()
 screen = pygame.display.set_mode(TAILLE_ECRAN)
 pygame.display.set_caption("Fenêtres avec texte et boutons")
 
+client = Client(
+    iduser=1,
+    nom="Dupont",
+    prenom="Jean",
+    order=None,
+    monnaie=10.0,
+    payment_strategy=PaypalStrategy(),
+    filepath_csv="./dossiercsv/client_inventaire.csv"
+)
+
+# Les observers des commandes sont appelés hors de la boucle pygame
+Order.diffuseur = DiffuseurNotifications()
+
 panier = Panier_fenetre(750, 0, 250, 600, user = client)
 produits_fenetre = Inventaire_Produits(panier)
 
@@ -129,15 +155,15 @@ fenetre_boutique.ajouter_texte("Vous êtes dans la Boutique", 250, 10, couleur=(
 
 bouton_menu = Bouton(fenetre_boutique, 500, 40, 100, 50, (255,100,100), ("Menu",30), action=ouvrir_menu)
 
-Bouton(fenetre_boutique, 20,  50, 100, 30, (100, 150, 255), ("Boisson",20), produits_fenetre.importer_liste, args =(inv_boisson,))
-Bouton(fenetre_boutique, 130, 50, 80, 30, (100, 150, 255), ("Inscription",20), produits_fenetre.importer_liste,args = (inv_ticket,))
-Bouton(fenetre_boutique, 220, 50, 140, 30, (100, 150, 255), ("Configuration PC",20), produits_fenetre.importer_liste,args = (inv_tech,))
-Bouton(fenetre_boutique, 370, 50, 100, 30, (100, 150, 255), ("Mercenariat",20), produits_fenetre.importer_liste,args = (inv_dev,))
+Bouton(fenetre_boutique, 20,  50, 100, 30, (100, 150, 255), ("Boisson",20), ouvrir_categorie, args =("boisson",))
+Bouton(fenetre_boutique, 130, 50, 80, 30, (100, 150, 255), ("Inscription",20), ouvrir_categorie,args = ("ticket",))
+Bouton(fenetre_boutique, 220, 50, 140, 30, (100, 150, 255), ("Configuration PC",20), ouvrir_categorie,args = ("tech",))
+Bouton(fenetre_boutique, 370, 50, 100, 30, (100, 150, 255), ("Mercenariat",20), ouvrir_categorie,args = ("developpeur",))
 
 Bouton(fenetre_boutique, 700, 50, 50, 30, (100, 150, 255), ("prix",20), produits_fenetre.trier_par_prix_spe)
 Bouton(fenetre_boutique, 640, 50, 50, 30, (100, 150, 255), ("alpa",20), produits_fenetre.trier_par_nom_spe)
-
-produits_fenetre.importer_liste(inv_boisson)
+Bouton(fenetre_boutique, 695, 100, 50, 30, (100, 150, 255), ("<",30), produits_fenetre.page_precedente)
+Bouton(fenetre_boutique, 695, 140, 50, 30, (100, 150, 255), (">",30), produits_fenetre.page_suivante)
 
 # ----------------------------
 # Fenetre Map
@@ -155,64 +181,54 @@ Bouton(fenetre_carte, 300, 400, 100, 50, (100, 150, 255), ("Menu",30), action=ou
 
 
 
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            
-            if len(popups) > 0 : 
-                for popup in popups[:]:
-                    for bouton in popup.boutons:
-                        bouton.est_clique(event.pos)
-            else : 
-                if fenetre_actuelle == "accueil":
-                    for bouton in fenetre_accueil.boutons:
-                        bouton.est_clique(event.pos)
-
-                elif fenetre_actuelle == "boutique":
-                    for bouton in fenetre_boutique.boutons:
-                        bouton.est_clique(event.pos)
-                    for produit in produits_fenetre.liste : 
-                        for bouton in produit.boutons : 
-                            bouton.est_clique(event.pos)
-
-                elif fenetre_actuelle == "carte":
-                    for bouton in fenetre_carte.boutons:
-                        bouton.est_clique(event.pos)
-                
-                
-                
-                for p in panier.produits : 
-                    for bouton in p.boutons : 
-                        bouton.est_clique(event.pos)
-                for bouton in panier.boutons :
-                    bouton.est_clique(event.pos)
-
-            
-
-    # Affichage
-    screen.fill((255, 255, 255))
-
+def scene_actuelle():
+    """Widgets affichés, du fond vers l'avant."""
     if fenetre_actuelle == "accueil":
-        fenetre_accueil.afficher(screen)
+        scene = [fenetre_accueil]
     elif fenetre_actuelle == "boutique":
-        fenetre_boutique.afficher(screen)
-        for produit in produits_fenetre.liste : 
-            produit.afficher(screen)
+        scene = [fenetre_boutique, *produits_fenetre.liste]
     elif fenetre_actuelle == "carte" : 
-        fenetre_carte.afficher(screen)
-    panier.afficher(screen)
-    for popup in popups:
-        popup.afficher(screen)
-    
-    
-    
+        scene = [fenetre_carte]
+    else:
+        scene = []
+    scene.append(panier)
+    scene.extend(popups)
+    return scene
+
 
-    pygame.display.flip()
+moteur = MoteurRendu(screen)
+cadenceur = Cadenceur(FPS_MAX)
+# Bouton sous la souris en O(1), quel que soit le nombre de produits
+index_clics = IndexClics(limites=screen.get_rect())
+index_clics.synchroniser(scene_actuelle())
 
+running = True
+while running:
+    # Aucune animation : la boucle dort jusqu'au prochain événement
+    for event in cadenceur.evenements():
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            # Contenu de la fenêtre perdu (recouverte, réduite...) : tout redessiner
+            moteur.invalider()
+        elif event.type == pygame.MOUSEWHEEL and fenetre_actuelle == "boutique":
+            produits_fenetre.defiler(-event.y)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            bouton = index_clics.bouton(event.pos)
+            # Tant qu'un popup est ouvert, seuls les boutons des popups répondent
+            if bouton is not None and (not popups or bouton.fenetre in popups):
+                bouton.est_clique(event.pos)
+                # L'action a pu changer d'écran, de page, remplir le panier...
+                index_clics.synchroniser(scene_actuelle())
+
+    # Affichage : seules les zones qui ont changé sont redessinées
+    scene = scene_actuelle()
+    moteur.dessiner(scene)
+    index_clics.synchroniser(scene, moteur.signature)
+
+stats = cadenceur.statistiques()
+print(f"[AFFICHAGE] {stats['images']} images ({stats['images_repos']} après attente), "
+      f"{stats['fps']:.1f} images/s, {stats['attente']:.0%} du temps en attente, "
+      f"travail moyen {stats['travail_moyen_ms']:.2f} ms, p95 {stats['travail_p95_ms']:.2f} ms, "
+      f"max {stats['travail_max_ms']:.2f} ms")
 pygame.quit()
-def delete (self) : 
-    self.liste.remove(self)
-    total.remove(self)
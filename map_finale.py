@@ -17,15 +17,15 @@ CORRECTIONS APPORTÉES:
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Tuple, Dict, Optional, Protocol
 from enum import Enum
 import heapq
-import folium
 import webbrowser
 from datetime import datetime
 import math
 import random as rd
+import time
 
 
 # ============================================================================
@@ -259,6 +259,35 @@ class Connexion:
 # RÉSULTAT D'ITINÉRAIRE
 # ============================================================================
 
+@dataclass
+class MetriquesRoutage:
+    """Compteurs de coût d'une requête de routage (instrumentation)"""
+    noeuds_visites: int = 0
+    aretes_relachees: int = 0
+    insertions_tas: int = 0
+    extractions_tas: int = 0
+    doublons_ignores: int = 0
+    duree_ms: float = 0.0
+    
+    def fusionner(self, autre: MetriquesRoutage) -> MetriquesRoutage:
+        """Additionne les compteurs de deux requêtes (ex : les deux tronçons d'un trajet)"""
+        return MetriquesRoutage(
+            self.noeuds_visites + autre.noeuds_visites,
+            self.aretes_relachees + autre.aretes_relachees,
+            self.insertions_tas + autre.insertions_tas,
+            self.extractions_tas + autre.extractions_tas,
+            self.doublons_ignores + autre.doublons_ignores,
+            self.duree_ms + autre.duree_ms
+        )
+    
+    def get_resume(self) -> str:
+        """Retourne une ligne lisible des compteurs"""
+        return (f"{self.noeuds_visites} nœuds visités, "
+                f"{self.aretes_relachees} arêtes relâchées, "
+                f"{self.insertions_tas} push / {self.extractions_tas} pop "
+                f"({self.doublons_ignores} doublons), {self.duree_ms:.3f} ms")
+
+
 @dataclass
 class ResultatItineraire:
     """Encapsule le résultat d'un calcul d'itinéraire"""
@@ -267,6 +296,7 @@ class ResultatItineraire:
     temps_total_heures: float
     distance_totale_km: float
     trouve: bool
+    metriques: Optional[MetriquesRoutage] = field(default=None, compare=False)
     
     @property
     def nombre_etapes(self) -> int:
@@ -305,6 +335,10 @@ class AlgorithmeRoutage(ABC):
 class DijkstraRoutage(AlgorithmeRoutage):
     """Implémentation de l'algorithme de Dijkstra"""
     
+    def __init__(self, instrumentation: bool = False):
+        # Si activée, chaque résultat porte ses MetriquesRoutage
+        self.instrumentation = instrumentation
+    
     def calculer_itineraire(self, graphe: 'ReseauHackathon',
                            depart: LieuHackathon,
                            arrivee: LieuHackathon,
@@ -319,11 +353,14 @@ class DijkstraRoutage(AlgorithmeRoutage):
             # Ceci garantit que le chemin passe FORCÉMENT par le point intermédiaire
             result1 = self._dijkstra_simple(graphe, depart, point_intermediaire)
             if not result1.trouve:
-                return ResultatItineraire([], [], float('inf'), 0, False)
+                return ResultatItineraire([], [], float('inf'), 0, False, result1.metriques)
             
             result2 = self._dijkstra_simple(graphe, point_intermediaire, arrivee)
+            metriques = None
+            if self.instrumentation:
+                metriques = result1.metriques.fusionner(result2.metriques)
             if not result2.trouve:
-                return ResultatItineraire([], [], float('inf'), 0, False)
+                return ResultatItineraire([], [], float('inf'), 0, False, metriques)
             
             # Fusion (éviter duplication du point intermédiaire)
             lieux_complets = result1.lieux + result2.lieux[1:]  # ← [1:] IMPORTANT !
@@ -336,7 +373,8 @@ class DijkstraRoutage(AlgorithmeRoutage):
                 connexions_completes,
                 temps_total,
                 distance_totale,
-                True
+                True,
+                metriques
             )
         else:
             # Dijkstra normal : départ → arrivée (peut passer par n'importe quel point)
@@ -347,6 +385,12 @@ class DijkstraRoutage(AlgorithmeRoutage):
                         arrivee: LieuHackathon) -> ResultatItineraire:
         """Dijkstra simple entre deux lieux"""
         
+        debut = time.perf_counter() if self.instrumentation else 0.0
+        # Compteurs locaux : quasi gratuits, seulement exposés si l'instrumentation est activée
+        extractions = 0
+        doublons = 0
+        relachees = 0
+        
         compteur = 0
         # Priority queue : (temps_cumule, compteur, lieu_actuel, chemin_lieux, chemin_connexions)
         pq = [(0, compteur, depart, [depart], [])]
@@ -355,8 +399,10 @@ class DijkstraRoutage(AlgorithmeRoutage):
         
         while pq:
             temps_actuel, _, lieu_actuel, chemin_lieux, chemin_connexions = heapq.heappop(pq)
+            extractions += 1
             
             if lieu_actuel in visites:
+                doublons += 1
                 continue
             
             visites.add(lieu_actuel)
@@ -369,12 +415,14 @@ class DijkstraRoutage(AlgorithmeRoutage):
                     chemin_connexions,
                     temps_actuel,
                     distance_totale,
-                    True
+                    True,
+                    self._metriques(debut, len(visites), relachees, compteur, extractions, doublons)
                 )
             
             # Explorer les voisins
             for voisin, connexion in lieu_actuel.get_voisins():
                 if voisin not in visites:
+                    relachees += 1
                     temps_trajet = connexion.calculer_temps_trajet()
                     nouveau_temps = temps_actuel + temps_trajet
                     
@@ -388,7 +436,25 @@ class DijkstraRoutage(AlgorithmeRoutage):
                     compteur += 1
         
         # Pas de chemin trouvé
-        return ResultatItineraire([], [], float('inf'), 0, False)
+        return ResultatItineraire(
+            [], [], float('inf'), 0, False,
+            self._metriques(debut, len(visites), relachees, compteur, extractions, doublons)
+        )
+    
+    def _metriques(self, debut: float, visites: int, relachees: int,
+                   insertions: int, extractions: int,
+                   doublons: int) -> Optional[MetriquesRoutage]:
+        """Construit les métriques de la requête, ou None si l'instrumentation est désactivée"""
+        if not self.instrumentation:
+            return None
+        return MetriquesRoutage(
+            noeuds_visites=visites,
+            aretes_relachees=relachees,
+            insertions_tas=insertions,
+            extractions_tas=extractions,
+            doublons_ignores=doublons,
+            duree_ms=(time.perf_counter() - debut) * 1000
+        )
 
 
 # ============================================================================
@@ -404,6 +470,10 @@ class StatistiquesReseau:
         self._nb_connexions_voiture = 0
         self._distance_totale_train = 0.0
         self._distance_totale_voiture = 0.0
+        # Instrumentation du routage (alimentée seulement si activée)
+        self._nb_requetes = 0
+        self._metriques_cumulees = MetriquesRoutage()
+        self._requete_plus_lente: Optional[Tuple[str, str, MetriquesRoutage]] = None
     
     def notifier_lieu_ajoute(self):
         """Notifié quand un lieu est ajouté"""
@@ -418,10 +488,46 @@ class StatistiquesReseau:
             self._nb_connexions_voiture += 1
             self._distance_totale_voiture += distance
     
+    def notifier_itineraire_calcule(self, depart: str, arrivee: str,
+                                    metriques: MetriquesRoutage):
+        """Notifié après chaque requête de routage instrumentée"""
+        self._nb_requetes += 1
+        self._metriques_cumulees = self._metriques_cumulees.fusionner(metriques)
+        if (self._requete_plus_lente is None
+                or metriques.duree_ms > self._requete_plus_lente[2].duree_ms):
+            self._requete_plus_lente = (depart, arrivee, metriques)
+    
+    @property
+    def nb_requetes(self) -> int:
+        return self._nb_requetes
+    
+    @property
+    def metriques_cumulees(self) -> MetriquesRoutage:
+        return self._metriques_cumulees
+    
+    @property
+    def requete_plus_lente(self) -> Optional[Tuple[str, str, MetriquesRoutage]]:
+        return self._requete_plus_lente
+    
+    def get_rapport_routage(self) -> str:
+        """Génère le rapport de l'instrumentation du routage"""
+        if self._nb_requetes == 0:
+            return "Aucune requête de routage instrumentée"
+        
+        cumul = self._metriques_cumulees
+        depart, arrivee, pire = self._requete_plus_lente
+        return f"""
+🧭 Requêtes de routage : {self._nb_requetes}
+   • Cumul : {cumul.get_resume()}
+   • Moyenne : {cumul.noeuds_visites / self._nb_requetes:.1f} nœuds, {cumul.duree_ms / self._nb_requetes:.3f} ms
+   • Plus lente : {depart} → {arrivee} ({pire.get_resume()})
+"""
+    
     def get_rapport(self) -> str:
         """Génère un rapport des statistiques"""
         total_connexions = self._nb_connexions_train + self._nb_connexions_voiture
         total_distance = self._distance_totale_train + self._distance_totale_voiture
+        rapport_routage = self.get_rapport_routage() if self._nb_requetes else ""
         
         return f"""
 ╔═══════════════════════════════════════════╗
@@ -436,7 +542,7 @@ class StatistiquesReseau:
 📏 Distance totale : {total_distance:.0f} km
    • 🚄 Réseau train : {self._distance_totale_train:.0f} km
    • 🚗 Réseau voiture : {self._distance_totale_voiture:.0f} km
-"""
+{rapport_routage}"""
 
 
 # ============================================================================
@@ -446,11 +552,15 @@ class StatistiquesReseau:
 class ReseauHackathon:
     """Gère tous les lieux et connexions avec Pattern Observer"""
     
-    def __init__(self):
+    def __init__(self, instrumentation: bool = False):
         self._lieux: Dict[str, LieuHackathon] = {}
-        self._algorithme = DijkstraRoutage()
+        self._algorithme = DijkstraRoutage(instrumentation)
         self._stats = StatistiquesReseau()
     
+    def activer_instrumentation(self, active: bool = True):
+        """Active ou désactive la collecte des métriques de routage"""
+        self._algorithme.instrumentation = active
+    
     def ajouter_lieu(self, lieu: LieuHackathon):
         """Ajoute un lieu au réseau"""
         self._lieux[lieu.nom] = lieu
@@ -522,7 +632,10 @@ class ReseauHackathon:
                 print(f"⚠️  ERREUR : Le point intermédiaire '{intermediaire_nom}' n'existe pas")
                 return ResultatItineraire([], [], float('inf'), 0, False)
         
-        return self._algorithme.calculer_itineraire(self, depart, arrivee, intermediaire)
+        resultat = self._algorithme.calculer_itineraire(self, depart, arrivee, intermediaire)
+        if resultat.metriques is not None:
+            self._stats.notifier_itineraire_calcule(depart_nom, arrivee_nom, resultat.metriques)
+        return resultat
     
     def get_statistiques(self) -> StatistiquesReseau:
         """Retourne l'objet statistiques"""
@@ -530,6 +643,10 @@ class ReseauHackathon:
     
     def generer_carte_interactive(self, itineraire: Optional[ResultatItineraire] = None):
         """Crée une carte interactive avec l'itinéraire"""
+        # Import différé : folium (et jinja2/branca/requests derrière lui) coûte
+        # près d'une seconde et n'est utile que pour générer une carte
+        import folium
+        
         # Carte centrée sur la France
         carte = folium.Map(location=[46.603354, 1.888334], zoom_start=6)
         
@@ -0,0 +1,205 @@
+"""
+Recherche dans tout le catalogue : texte sur le nom, fourchette de prix et
+facettes (catégorie, Vetement.taille, Tech.garantie, Developpeur.niveau,
+Boisson.volume).
+
+L'index est construit une fois sur les inventaires, chaque produit recevant
+un numéro (sa position dans l'index) :
+- index inversé mot -> numéros des produits dont le nom contient ce mot
+  (le dernier mot de la requête est cherché comme préfixe : "coc" trouve
+  "Coca-Cola")
+- numéros triés par prix, avec le tableau des prix correspondant : une
+  fourchette de prix est une tranche trouvée par bisect
+- par facette, valeur -> numéros des produits, et la valeur de chaque
+  produit (liste indexée par numéro) pour filtrer
+
+Une requête part de l'ensemble candidat le plus petit (résultat du texte,
+tranche de prix ou valeurs de facette) et filtre les autres critères produit
+par produit en O(1). Voir benchmarks/bench_recherche.py.
+
+Usage :
+    index = catalogue.recherche()
+    resultat = index.rechercher("coca", prix_max=3, tri="prix", limite=12)
+    resultat.total, resultat.produits, resultat.compter("categorie")
+"""
+
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+# Facettes indexées : nom -> attribut du produit (None si le produit ne l'a pas)
+FACETTES = ("categorie", "taille", "garantie", "niveau", "volume")
+
+_MOT = re.compile(r"[a-z0-9]+")
+
+
+def mots(texte):
+    """Mots d'un texte, en minuscules et sans accents."""
+    texte = unicodedata.normalize("NFKD", str(texte).lower())
+    return _MOT.findall(texte.encode("ascii", "ignore").decode("ascii"))
+
+
+@dataclass
+class ResultatRecherche:
+    total: int                                  # nombre de produits trouvés
+    produits: list                              # page demandée (debut, limite)
+    _numeros: list = field(repr=False, default_factory=list)
+    _index: "IndexRecherche" = field(repr=False, default=None)
+
+    def compter(self, facette):
+        """Nombre de produits trouvés par valeur de la facette (Counter)."""
+        valeurs = self._index._facettes[facette]
+        compte = Counter(valeurs[n] for n in self._numeros)
+        compte.pop(None, None)
+        return compte
+
+
+class IndexRecherche:
+
+    def __init__(self, inventaires):
+        """`inventaires` : dict catégorie -> Inventaire_*"""
+        self._produits = []
+        self._facettes = {facette: [] for facette in FACETTES}
+        self._par_facette = {facette: {} for facette in FACETTES}
+        self._mots = {}
+        for categorie, inventaire in inventaires.items():
+            for produit in inventaire._produits.values():
+                self._ajouter(categorie, produit)
+        self._vocabulaire = sorted(self._mots)
+
+        prix = [float(p.prix) for p in self._produits]
+        self._prix = array("d", prix)
+        self._par_prix = array("l", sorted(range(len(prix)), key=prix.__getitem__))
+        self._prix_tries = array("d", (prix[n] for n in self._par_prix))
+        self._rang_nom = None
+
+    def _ajouter(self, categorie, produit):
+        numero = len(self._produits)
+        self._produits.append(produit)
+        for facette in FACETTES:
+            valeur = categorie if facette == "categorie" else getattr(produit, facette, None)
+            self._facettes[facette].append(valeur)
+            if valeur is not None:
+                self._par_facette[facette].setdefault(valeur, array("l")).append(numero)
+        for mot in set(mots(produit.nom)):
+            numeros = self._mots.get(mot)
+            if numeros is None:
+                self._mots[mot] = numeros = array("l")
+            numeros.append(numero)
+
+    def __len__(self):
+        return len(self._produits)
+
+    # ================= Critères =================
+
+    def _numeros_prefixe(self, prefixe):
+        debut = bisect_left(self._vocabulaire, prefixe)
+        fin = bisect_left(self._vocabulaire, prefixe + "\x7f", debut)
+        if fin - debut == 1:
+            return self._mots[self._vocabulaire[debut]]
+        resultat = set()
+        for mot in self._vocabulaire[debut:fin]:
+            resultat.update(self._mots[mot])
+        return resultat
+
+    def _numeros_texte(self, texte):
+        """Numéros des produits dont le nom contient tous les mots (le dernier en préfixe)."""
+        termes = mots(texte)
+        listes = [self._mots.get(t, ()) for t in termes[:-1]] + [self._numeros_prefixe(termes[-1])]
+        listes.sort(key=len)
+        resultat = set(listes[0])
+        for numeros in listes[1:]:
+            if not resultat:
+                break
+            resultat.intersection_update(numeros)
+        return resultat
+
+    def _tranche_prix(self, prix_min, prix_max):
+        debut = 0 if prix_min is None else bisect_left(self._prix_tries, prix_min)
+        fin = len(self._prix_tries) if prix_max is None else bisect_right(self._prix_tries, prix_max)
+        return debut, max(debut, fin)
+
+    # ================= Requête =================
+
+    def rechercher(self, texte="", prix_min=None, prix_max=None, tri=None,
+                   debut=0, limite=None, **facettes):
+        """
+        Produits dont le nom contient les mots de `texte`, de prix compris
+        entre prix_min et prix_max (inclus), et dont chaque facette donnée
+        vaut la valeur indiquée (ou l'une des valeurs si une liste est donnée),
+        ex : rechercher(categorie="vetement", taille=["M", "L"]).
+
+        tri : None (ordre du catalogue), "prix" ou "nom".
+        Seule la page [debut, debut + limite[ est convertie en produits.
+        """
+        for facette in facettes:
+            if facette not in self._facettes:
+                raise ValueError(f"Facette inconnue : {facette}")
+        if tri not in (None, "prix", "nom"):
+            raise ValueError(f"Clé de tri inconnue : {tri}")
+        voulues = {f: set(v) if isinstance(v, (list, tuple, set)) else {v}
+                   for f, v in facettes.items()}
+
+        # Ensemble candidat le plus petit, les autres critères servent de filtres
+        candidats = []
+        texte_trouve = self._numeros_texte(texte) if mots(texte) else None
+        if texte_trouve is not None:
+            candidats.append((len(texte_trouve), "texte"))
+        if prix_min is None and prix_max is None:
+            candidats.append((len(self._produits), "tout"))
+        else:
+            debut_prix, fin_prix = self._tranche_prix(prix_min, prix_max)
+            candidats.append((fin_prix - debut_prix, "prix"))
+        for facette in voulues:
+            par_valeur = self._par_facette[facette]
+            candidats.append((sum(len(par_valeur.get(v, ())) for v in voulues[facette]), facette))
+        _, base = min(candidats, key=lambda c: c[0])
+
+        if base == "texte":
+            numeros = sorted(texte_trouve)
+        elif base == "prix":
+            numeros = self._par_prix[debut_prix:fin_prix]
+        elif base == "tout":
+            numeros = self._par_prix if tri == "prix" else range(len(self._produits))
+        else:
+            listes = [self._par_facette[base].get(v, ()) for v in voulues[base]]
+            numeros = listes[0] if len(listes) == 1 else sorted(n for l in listes for n in l)
+
+        filtres = []
+        if texte_trouve is not None and base != "texte":
+            filtres.append(texte_trouve.__contains__)
+        if base != "prix" and (prix_min is not None or prix_max is not None):
+            prix = self._prix
+            bas = float("-inf") if prix_min is None else prix_min
+            haut = float("inf") if prix_max is None else prix_max
+            filtres.append(lambda n: bas <= prix[n] <= haut)
+        for facette, voulu in voulues.items():
+            if facette != base:
+                valeurs = self._facettes[facette]
+                filtres.append(lambda n, valeurs=valeurs, voulu=voulu: valeurs[n] in voulu)
+        for filtre in filtres:
+            numeros = [n for n in numeros if filtre(n)]
+
+        if tri == "prix" and base not in ("prix", "tout"):
+            numeros = sorted(numeros, key=self._prix.__getitem__)
+        elif tri == "nom":
+            numeros = sorted(numeros, key=self._rangs_nom().__getitem__)
+        elif tri is None and base == "prix":
+            numeros = sorted(numeros)
+
+        fin = None if limite is None else debut + limite
+        return ResultatRecherche(len(numeros), [self._produits[n] for n in numeros[debut:fin]],
+                                 numeros, self)
+
+    def _rangs_nom(self):
+        """Rang de chaque produit dans l'ordre alphabétique (calculé au premier tri par nom)."""
+        if self._rang_nom is None:
+            ordre = sorted(range(len(self._produits)), key=lambda n: str(self._produits[n].nom).lower())
+            self._rang_nom = array("l", [0]) * len(ordre)
+            for rang, n in enumerate(ordre):
+                self._rang_nom[n] = rang
+        return self._rang_nom
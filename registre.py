@@ -0,0 +1,99 @@
+"""
+Registre des soldes et des stocks, sûr en cas de paiements concurrents.
+
+Un paiement vérifie puis débite le solde du client et le stock de chaque
+produit commandé ; fait sans précaution depuis plusieurs threads, deux
+paiements peuvent lire le même solde et dépenser deux fois le même argent
+(ou vendre deux fois le dernier ticket). Ici, la vérification et le débit
+se font d'un bloc : tout passe ou rien ne passe.
+
+- RegistreMemoire : dans un processus, verrous répartis par clé ("lock
+  striping") ; deux paiements sur des comptes / produits différents ne
+  s'attendent pas (sauf collision de hash sur un même verrou)
+- stockage_sqlite.RegistreSQLite : même interface, partagé entre processus
+
+Un registre est branché derrière les paiements via Client(..., registre=...).
+Les montants sont en centimes entiers. Un produit dont le stock n'a jamais
+été défini est considéré illimité.
+"""
+
+import threading
+
+
+class RegistreMemoire:
+
+    def __init__(self, nombre_verrous=64):
+        self._verrous = [threading.Lock() for _ in range(nombre_verrous)]
+        self._soldes = {}   # compte -> centimes
+        self._stocks = {}   # id produit -> quantité
+
+    def _verrous_pour(self, cles):
+        # Toujours pris dans l'ordre des indices : pas d'interblocage possible
+        indices = sorted({hash(cle) % len(self._verrous) for cle in cles})
+        return [self._verrous[i] for i in indices]
+
+    def _sous_verrous(self, cles):
+        return _Verrous(self._verrous_pour(cles))
+
+    # ================= Comptes =================
+
+    def ouvrir_compte(self, compte, centimes=0):
+        """Crée le compte avec ce solde s'il n'existe pas encore."""
+        with self._sous_verrous([("compte", compte)]):
+            self._soldes.setdefault(compte, centimes)
+
+    def crediter(self, compte, centimes):
+        with self._sous_verrous([("compte", compte)]):
+            self._soldes[compte] = self._soldes.get(compte, 0) + centimes
+
+    def solde(self, compte):
+        return self._soldes.get(compte, 0)
+
+    # ================= Stocks =================
+
+    def definir_stock(self, id_produit, quantite):
+        with self._sous_verrous([("stock", id_produit)]):
+            self._stocks[id_produit] = quantite
+
+    def stock(self, id_produit):
+        """Quantité restante, ou None si le produit n'est pas suivi (illimité)."""
+        return self._stocks.get(id_produit)
+
+    # ================= Paiement =================
+
+    def debiter(self, compte, montant_centimes, quantites=None):
+        """
+        Débite `montant_centimes` du compte et retire `quantites` (dict
+        id produit -> quantité) des stocks, seulement si le solde et tous les
+        stocks suffisent. Retourne True si le paiement est passé.
+        """
+        quantites = quantites or {}
+        cles = [("compte", compte)] + [("stock", id_produit) for id_produit in quantites]
+        with self._sous_verrous(cles):
+            solde = self._soldes.get(compte, 0)
+            if solde < montant_centimes:
+                return False
+            for id_produit, quantite in quantites.items():
+                restant = self._stocks.get(id_produit)
+                if restant is not None and restant < quantite:
+                    return False
+            self._soldes[compte] = solde - montant_centimes
+            for id_produit, quantite in quantites.items():
+                if id_produit in self._stocks:
+                    self._stocks[id_produit] -= quantite
+            return True
+
+
+class _Verrous:
+    """Prend une liste de verrous dans l'ordre, les rend dans l'ordre inverse."""
+
+    def __init__(self, verrous):
+        self.verrous = verrous
+
+    def __enter__(self):
+        for verrou in self.verrous:
+            verrou.acquire()
+
+    def __exit__(self, *exc):
+        for verrou in reversed(self.verrous):
+            verrou.release()
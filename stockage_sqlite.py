@@ -0,0 +1,382 @@
+"""
+Stockage SQLite optionnel pour le catalogue, les clients et les commandes.
+
+Remplace les fichiers CSV derrière les API existantes :
+- Catalogue(stockage=...) lit les catégories dans la base, et les Inventaire_*
+  qu'il fournit y répercutent leurs ajouts / suppressions
+- Admin(..., stockage=...) et Client(..., stockage=...) y écrivent au lieu des CSV
+
+La base est en mode WAL (lectures concurrentes pendant une écriture, plusieurs
+processus), les écritures sont regroupées par lots (executemany dans une seule
+transaction), et les ids / catégories sont indexés.
+
+RegistreSQLite est la version partagée entre processus de registre.RegistreMemoire
+(soldes et stocks débités de façon atomique lors des paiements).
+
+Import initial depuis les CSV :
+    python stockage_sqlite.py dossiercsv hackifind.db
+"""
+
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from classes_boutiques import Observer
+
+
+# Classe produit -> catégorie (mêmes noms que boutique.CATEGORIES)
+CATEGORIE_PAR_CLASSE = {
+    "Boisson": "boisson",
+    "Food": "food",
+    "Vetement": "vetement",
+    "Tech": "tech",
+    "Developpeur": "developpeur",
+    "TicketHackathon": "ticket",
+}
+
+COLONNES_PRODUIT = ["id", "categorie", "nom", "prix", "image_path",
+                    "volume", "taille", "garantie", "niveau"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS produits (
+    id TEXT PRIMARY KEY,
+    categorie TEXT NOT NULL,
+    nom TEXT NOT NULL,
+    prix REAL NOT NULL,
+    image_path TEXT,
+    volume REAL,
+    taille TEXT,
+    garantie INTEGER,
+    niveau TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_produits_categorie ON produits (categorie, prix);
+
+CREATE TABLE IF NOT EXISTS clients (
+    iduser TEXT PRIMARY KEY,
+    nom TEXT,
+    prenom TEXT
+);
+
+CREATE TABLE IF NOT EXISTS inventaires_clients (
+    ligne INTEGER PRIMARY KEY AUTOINCREMENT,
+    iduser TEXT NOT NULL,
+    id_produit TEXT NOT NULL,
+    nom TEXT,
+    prix REAL,
+    image_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_inventaires_clients ON inventaires_clients (iduser, id_produit);
+
+CREATE TABLE IF NOT EXISTS commandes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    utilisateur TEXT,
+    montant REAL,
+    statut TEXT,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_commandes_utilisateur ON commandes (utilisateur);
+"""
+
+_UPSERT_PRODUIT = (f"INSERT OR REPLACE INTO produits ({', '.join(COLONNES_PRODUIT)}) "
+                   f"VALUES ({', '.join('?' * len(COLONNES_PRODUIT))})")
+_DELETE_PRODUIT = "DELETE FROM produits WHERE id = ?"
+_INSERT_INVENTAIRE = ("INSERT INTO inventaires_clients (iduser, id_produit, nom, prix, image_path) "
+                      "VALUES (?, ?, ?, ?, ?)")
+
+
+class StockageSQLite:
+    """
+    Accès à la base. Les écritures sont mises en attente et envoyées par lots :
+    dès que `taille_lot` opérations sont en attente, avant toute lecture, et
+    sur valider() / fermer().
+
+    Les appelants valident à la fin de chaque opération publique (Inventaire,
+    Admin, Client) : les écritures en attente ne sont que celles d'une même
+    opération. fermer() est de toute façon appelée à la sortie de l'interpréteur.
+    """
+
+    def __init__(self, chemin, taille_lot=1000):
+        self.chemin = chemin
+        self.taille_lot = taille_lot
+        self._verrou = threading.RLock()
+        self._en_attente = []   # [(requête, paramètres)] dans l'ordre d'arrivée
+        self.connexion = sqlite3.connect(chemin, timeout=30, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+        self.connexion.executescript(SCHEMA)
+        atexit.register(self.fermer)
+
+    # ================= Écritures par lots =================
+
+    def _differer(self, requete, parametres):
+        with self._verrou:
+            self._en_attente.append((requete, parametres))
+            if len(self._en_attente) >= self.taille_lot:
+                self.valider()
+
+    def valider(self):
+        """Envoie les écritures en attente dans une seule transaction."""
+        with self._verrou:
+            if not self._en_attente:
+                return
+            en_attente, self._en_attente = self._en_attente, []
+            with self.connexion:
+                # Les opérations consécutives identiques partent en un seul executemany
+                debut = 0
+                for i in range(1, len(en_attente) + 1):
+                    if i == len(en_attente) or en_attente[i][0] != en_attente[debut][0]:
+                        self.connexion.executemany(en_attente[debut][0],
+                                                   [p for _, p in en_attente[debut:i]])
+                        debut = i
+
+    def _lire(self, requete, parametres=()):
+        with self._verrou:
+            self.valider()
+            return self.connexion.execute(requete, parametres).fetchall()
+
+    def fermer(self):
+        with self._verrou:
+            atexit.unregister(self.fermer)
+            self.valider()
+            self.connexion.close()
+
+    # ================= Catalogue =================
+
+    @staticmethod
+    def _ligne_produit(produit):
+        return (produit.id, CATEGORIE_PAR_CLASSE[type(produit).__name__],
+                produit.nom, produit.prix, produit.image_path,
+                getattr(produit, "volume", None), getattr(produit, "taille", None),
+                getattr(produit, "garantie", None), getattr(produit, "niveau", None))
+
+    def ajouter_produits(self, produits):
+        for produit in produits:
+            self._differer(_UPSERT_PRODUIT, self._ligne_produit(produit))
+
+    def supprimer_produit(self, id_produit):
+        self._differer(_DELETE_PRODUIT, (str(id_produit),))
+
+    def vider_categories(self, produits):
+        """Supprime tous les produits des catégories de `produits`."""
+        categories = {CATEGORIE_PAR_CLASSE[type(p).__name__] for p in produits}
+        for categorie in sorted(categories):
+            self._differer("DELETE FROM produits WHERE categorie = ?", (categorie,))
+
+    def contient_produit(self, id_produit):
+        return bool(self._lire("SELECT 1 FROM produits WHERE id = ?", (str(id_produit),)))
+
+    def compter_produits(self, categorie=None):
+        if categorie is None:
+            return self._lire("SELECT COUNT(*) FROM produits")[0][0]
+        return self._lire("SELECT COUNT(*) FROM produits WHERE categorie = ?", (categorie,))[0][0]
+
+    def lire_colonnes(self, categorie, colonnes):
+        """
+        Colonnes demandées des produits de `categorie`, au même format que
+        boutique.lire_colonnes_categorie (dict colonne -> liste).
+        """
+        colonnes = list(colonnes)
+        lignes = self._lire(f"SELECT {', '.join(colonnes)} FROM produits "
+                            f"WHERE categorie = ? ORDER BY rowid", (categorie,))
+        valeurs = list(zip(*lignes)) if lignes else [()] * len(colonnes)
+        return {c: list(v) for c, v in zip(colonnes, valeurs)}
+
+    def importer_csv(self, dossier):
+        """
+        Import en une fois de tous les CSV du catalogue de `dossier` (mêmes règles
+        de lecture que la boutique). Retourne le nombre de produits importés.
+        """
+        from boutique import CATEGORIES, lire_colonnes_categorie
+
+        total = 0
+        for categorie, (fichier, _, _, _) in CATEGORIES.items():
+            valeurs = lire_colonnes_categorie(categorie, os.path.join(dossier, fichier), cache=False)
+            nombre = len(valeurs["id"])
+            valeurs["categorie"] = [categorie] * nombre
+            for ligne in zip(*(valeurs.get(c, [None] * nombre) for c in COLONNES_PRODUIT)):
+                self._differer(_UPSERT_PRODUIT, ligne)
+            total += nombre
+        self.valider()
+        return total
+
+    # ================= Clients =================
+
+    def ajouter_client(self, iduser, nom, prenom):
+        self._differer("INSERT OR REPLACE INTO clients (iduser, nom, prenom) VALUES (?, ?, ?)",
+                       (str(iduser), nom, prenom))
+
+    def supprimer_client(self, iduser):
+        existe = bool(self._lire("SELECT 1 FROM clients WHERE iduser = ?", (str(iduser),)))
+        self._differer("DELETE FROM clients WHERE iduser = ?", (str(iduser),))
+        return existe
+
+    @staticmethod
+    def _ligne_inventaire(iduser, produit):
+        return (str(iduser), produit.id, produit.nom, produit.prix, produit.image_path)
+
+    def ajouter_inventaire_client(self, iduser, produits):
+        for produit in produits:
+            self._differer(_INSERT_INVENTAIRE, self._ligne_inventaire(iduser, produit))
+
+    def remplacer_inventaire_client(self, iduser, produits):
+        self._differer("DELETE FROM inventaires_clients WHERE iduser = ?", (str(iduser),))
+        self.ajouter_inventaire_client(iduser, produits)
+
+    def supprimer_produit_inventaire_client(self, iduser, id_produit):
+        existe = bool(self._lire("SELECT 1 FROM inventaires_clients WHERE iduser = ? AND id_produit = ?",
+                                 (str(iduser), str(id_produit))))
+        self._differer("DELETE FROM inventaires_clients WHERE iduser = ? AND id_produit = ?",
+                       (str(iduser), str(id_produit)))
+        return existe
+
+    def lire_inventaire_client(self, iduser):
+        """Lignes (id, nom, prix, image_path) de l'inventaire du client."""
+        return self._lire("SELECT id_produit, nom, prix, image_path FROM inventaires_clients "
+                          "WHERE iduser = ? ORDER BY ligne", (str(iduser),))
+
+    # ================= Commandes =================
+
+    def enregistrer_paiement(self, payment_info):
+        self._differer("INSERT INTO commandes (utilisateur, montant, statut, date) VALUES (?, ?, ?, ?)",
+                       (str(payment_info["user"]), payment_info["amount"], payment_info["statut"],
+                        datetime.now().isoformat(timespec="seconds")))
+
+    def lire_commandes(self, utilisateur):
+        return self._lire("SELECT montant, statut, date FROM commandes WHERE utilisateur = ? "
+                          "ORDER BY id", (str(utilisateur),))
+
+
+SCHEMA_REGISTRE = """
+CREATE TABLE IF NOT EXISTS soldes (
+    compte TEXT PRIMARY KEY,
+    centimes INTEGER NOT NULL CHECK (centimes >= 0)
+);
+CREATE TABLE IF NOT EXISTS stocks (
+    id_produit TEXT PRIMARY KEY,
+    quantite INTEGER NOT NULL CHECK (quantite >= 0)
+);
+"""
+
+
+class RegistreSQLite:
+    """
+    Registre des soldes et des stocks (même interface que
+    registre.RegistreMemoire) partagé entre threads et processus.
+
+    Chaque débit est une transaction BEGIN IMMEDIATE dont les UPDATE ne
+    s'appliquent que si le solde / stock suffit (... WHERE centimes >= ?) :
+    la vérification et l'écriture ne peuvent pas être séparées par un autre
+    paiement, quel que soit le processus. Une connexion par thread et par
+    processus ; l'objet peut être transmis à multiprocessing (seul le chemin
+    est copié).
+    """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self._local = threading.local()
+        with self._connexion() as connexion:
+            connexion.executescript(SCHEMA_REGISTRE)
+
+    def __getstate__(self):
+        return {"chemin": self.chemin}
+
+    def __setstate__(self, etat):
+        self.chemin = etat["chemin"]
+        self._local = threading.local()
+
+    def _connexion(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.connexion = sqlite3.connect(self.chemin, timeout=30, isolation_level=None)
+            local.connexion.execute("PRAGMA journal_mode=WAL")
+            local.connexion.execute("PRAGMA synchronous=NORMAL")
+            local.pid = os.getpid()
+        return local.connexion
+
+    def _transaction(self, operation):
+        connexion = self._connexion()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            resultat = operation(connexion)
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        connexion.execute("COMMIT" if resultat is not False else "ROLLBACK")
+        return resultat
+
+    # ================= Comptes =================
+
+    def ouvrir_compte(self, compte, centimes=0):
+        self._connexion().execute("INSERT OR IGNORE INTO soldes (compte, centimes) VALUES (?, ?)",
+                                  (str(compte), centimes))
+
+    def crediter(self, compte, centimes):
+        self._connexion().execute(
+            "INSERT INTO soldes (compte, centimes) VALUES (?, ?) "
+            "ON CONFLICT (compte) DO UPDATE SET centimes = centimes + excluded.centimes",
+            (str(compte), centimes))
+
+    def solde(self, compte):
+        ligne = self._connexion().execute("SELECT centimes FROM soldes WHERE compte = ?",
+                                          (str(compte),)).fetchone()
+        return ligne[0] if ligne else 0
+
+    # ================= Stocks =================
+
+    def definir_stock(self, id_produit, quantite):
+        self._connexion().execute("INSERT OR REPLACE INTO stocks (id_produit, quantite) VALUES (?, ?)",
+                                  (str(id_produit), quantite))
+
+    def stock(self, id_produit):
+        ligne = self._connexion().execute("SELECT quantite FROM stocks WHERE id_produit = ?",
+                                          (str(id_produit),)).fetchone()
+        return ligne[0] if ligne else None
+
+    # ================= Paiement =================
+
+    def debiter(self, compte, montant_centimes, quantites=None):
+        def operation(connexion):
+            if connexion.execute("UPDATE soldes SET centimes = centimes - ? "
+                                 "WHERE compte = ? AND centimes >= ?",
+                                 (montant_centimes, str(compte), montant_centimes)).rowcount == 0:
+                return False
+            for id_produit, quantite in (quantites or {}).items():
+                if connexion.execute("UPDATE stocks SET quantite = quantite - ? "
+                                     "WHERE id_produit = ? AND quantite >= ?",
+                                     (quantite, str(id_produit), quantite)).rowcount == 0:
+                    # Produit non suivi : stock illimité ; sinon stock insuffisant
+                    if connexion.execute("SELECT 1 FROM stocks WHERE id_produit = ?",
+                                         (str(id_produit),)).fetchone():
+                        return False
+            return True
+        return self._transaction(operation)
+
+
+class HistoriqueCommandesObserver(Observer):
+    """Observer qui enregistre chaque changement de statut de commande dans la base."""
+
+    def __init__(self, stockage):
+        self.stockage = stockage
+
+    def update(self, payment_info):
+        self.stockage.enregistrer_paiement(payment_info)
+        self.stockage.valider()
+
+    def update_lot(self, payment_infos):
+        # Une seule transaction pour tout le lot de notifications
+        for payment_info in payment_infos:
+            self.stockage.enregistrer_paiement(payment_info)
+        self.stockage.valider()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage : python stockage_sqlite.py <dossier_csv> <base.db>")
+        sys.exit(1)
+    stockage = StockageSQLite(sys.argv[2])
+    nombre = stockage.importer_csv(sys.argv[1])
+    stockage.fermer()
+    print(f"{nombre} produits importés dans {sys.argv[2]}")